@@ -891,8 +891,8 @@ async function handleBacktestSubmit(event) {
       });
     }
 
-    if (data.output_csv) {
-      backtestMessage.innerHTML += `<br><span class="status-success">📁 Saved CSV: ${data.output_csv}</span>`;
+    if (data.output_path) {
+      backtestMessage.innerHTML += `<br><span class="status-success">📁 Saved trades (${data.output_format}): ${data.output_path}</span>`;
     }
 
     if (data.summary) {
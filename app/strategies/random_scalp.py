@@ -10,15 +10,16 @@ parameter toggles, and plumbing tests.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+from numba import njit
 import numpy as np
 import pandas as pd
 from pydantic import BaseModel, Field, ConfigDict
 
 from tsdb_pipeline import read_ohlcv_from_tsdb
 from symbol_utils import get_option_pair, is_option_symbol
+from trade_io import write_trades
 
 
 # ==================== STRATEGY METADATA ====================
@@ -92,19 +93,119 @@ def get_info() -> Dict[str, Any]:
 
 # ==================== CORE STRATEGY ====================
 
-@dataclass
-class TradeResult:
-    entry_time: pd.Timestamp
-    exit_time: pd.Timestamp
-    symbol: str
-    side: str
-    entry: float
-    exit: float
-    gross_rupees: float
-    costs_rupees: float
-    pnl_rupees: float
-    exit_reason: str
-    cumulative_equity: float
+TRADE_COLUMNS = [
+    "entry_time",
+    "exit_time",
+    "symbol",
+    "side",
+    "entry",
+    "exit",
+    "gross_rupees",
+    "costs_rupees",
+    "pnl_rupees",
+    "exit_reason",
+    "cumulative_equity",
+]
+
+EXIT_REASONS = ("Target Hit", "Stoploss Hit", "Close @ Bar End", "Forced Exit (New Entry)", "End of Data")
+_TARGET, _STOPLOSS, _BAR_END, _FORCED, _END_OF_DATA = range(5)
+
+
+@njit(cache=True)
+def _simulate_bars(
+    open_, high, low, close, trade_gap, profit_target, stop_loss,
+    qty_rupees, costs, close_at_bar_close, wait_for_exit, starting_capital,
+):
+    """
+    Long-only cadence simulation over plain arrays. Exits are checked before
+    entries on each bar; an entry fills at the bar's open.
+    Returns (entry_idx, exit_idx, entry, exit, reason_code, equity).
+    """
+    n = len(close)
+    max_trades = n + 1
+    entry_idx = np.empty(max_trades, dtype=np.int64)
+    exit_idx = np.empty(max_trades, dtype=np.int64)
+    entry_px = np.empty(max_trades, dtype=np.float64)
+    exit_px = np.empty(max_trades, dtype=np.float64)
+    reasons = np.empty(max_trades, dtype=np.int64)
+    equity_curve = np.empty(max_trades, dtype=np.float64)
+
+    equity = starting_capital
+    count = 0
+    in_position = False
+    entry = 0.0
+    entry_at = 0
+
+    for i in range(n):
+        # If we have an open position, check for exit
+        if in_position:
+            target_price = entry + profit_target
+            reason = -1
+            px = 0.0
+            if high[i] >= target_price:
+                px = target_price
+                reason = _TARGET
+            elif stop_loss > 0 and low[i] <= entry - stop_loss:
+                px = entry - stop_loss
+                reason = _STOPLOSS
+            elif close_at_bar_close:
+                px = close[i]
+                reason = _BAR_END
+
+            if reason >= 0:
+                equity += (px - entry) * qty_rupees - costs
+                entry_idx[count] = entry_at
+                exit_idx[count] = i
+                entry_px[count] = entry
+                exit_px[count] = px
+                reasons[count] = reason
+                equity_curve[count] = equity
+                count += 1
+                in_position = False
+
+        if i % trade_gap == 0 and (not in_position or not wait_for_exit):
+            if in_position:
+                # New entry forces the open position out at this bar's open
+                px = open_[i]
+                equity += (px - entry) * qty_rupees - costs
+                entry_idx[count] = entry_at
+                exit_idx[count] = i
+                entry_px[count] = entry
+                exit_px[count] = px
+                reasons[count] = _FORCED
+                equity_curve[count] = equity
+                count += 1
+            in_position = True
+            entry = open_[i]
+            entry_at = i
+
+    # Close any remaining open position at the end
+    if in_position:
+        px = close[n - 1]
+        equity += (px - entry) * qty_rupees - costs
+        entry_idx[count] = entry_at
+        exit_idx[count] = n - 1
+        entry_px[count] = entry
+        exit_px[count] = px
+        reasons[count] = _END_OF_DATA
+        equity_curve[count] = equity
+        count += 1
+
+    return (
+        entry_idx[:count], exit_idx[:count], entry_px[:count],
+        exit_px[:count], reasons[:count], equity_curve[:count],
+    )
+
+
+def warm_up() -> None:
+    """Compile `_simulate_bars` on a tiny input so the first backtest skips the JIT stall."""
+    base = np.array([100.0, 101.0, 102.0, 101.5])
+    # pandas copy-on-write hands out read-only column arrays; compile both variants
+    for writeable in (True, False):
+        ohlc = [base.copy() for _ in range(4)]
+        for arr in ohlc:
+            arr.setflags(write=writeable)
+        _simulate_bars(*ohlc, 1, 1.0, 0.5, 1.0, 0.0, True, False, 100_000.0)
 
 
 class RandomScalpRunner:
@@ -179,10 +280,7 @@ class RandomScalpRunner:
 
     # ---------- Trade Simulation ----------
 
-    def _simulate_symbol(self, symbol: str, df: pd.DataFrame) -> List[TradeResult]:
-        trades: List[TradeResult] = []
-        equity = float(self.starting_capital)
-
+    def _simulate_symbol(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
         profit_target = float(self.params.profit_target_rupees)
         stop_loss = float(self.params.stop_loss_rupees)
         trade_gap = max(int(self.params.trade_every_n_bars), 1)
@@ -196,148 +294,45 @@ class RandomScalpRunner:
         if df.empty:
             import logging
             logging.warning(f"RandomScalp: No data loaded for {symbol}")
-            return trades
+            return pd.DataFrame(columns=TRADE_COLUMNS)
 
         import logging
         logging.info(f"RandomScalp: Simulating {symbol} with {len(df)} bars, trade_gap={trade_gap}")
 
-        # Track open position
-        open_position = None
-        bars_since_entry = 0
-
-        for idx, (ts, row) in enumerate(df.iterrows()):
-            # If we have an open position, check for exit
-            if open_position is not None:
-                bars_since_entry += 1
-                entry_price = open_position["entry_price"]
-                entry_time = open_position["entry_time"]
-                target_price = entry_price + profit_target
-                stop_price = entry_price - stop_loss if stop_loss > 0 else None
-
-                high = float(row["high"])
-                low = float(row["low"])
-
-                exit_price = None
-                exit_reason = None
-
-                # Check if target or stoploss hit
-                if high >= target_price:
-                    exit_price = target_price
-                    exit_reason = "Target Hit"
-                elif stop_price is not None and low <= stop_price:
-                    exit_price = stop_price
-                    exit_reason = "Stoploss Hit"
-                elif close_at_bar_close:
-                    # Close at bar close if option is enabled
-                    exit_price = float(row["close"])
-                    exit_reason = "Close @ Bar End"
-
-                # If we have an exit, record the trade
-                if exit_price is not None:
-                    pnl_points = exit_price - entry_price
-                    gross = pnl_points * qty_rupees
-                    costs = broker_fee + slippage
-                    pnl = gross - costs
-                    equity += pnl
-
-                    trades.append(
-                        TradeResult(
-                            entry_time=entry_time,
-                            exit_time=ts,
-                            symbol=symbol,
-                            side="LONG",
-                            entry=entry_price,
-                            exit=exit_price,
-                            gross_rupees=gross,
-                            costs_rupees=costs,
-                            pnl_rupees=pnl,
-                            exit_reason=exit_reason,
-                            cumulative_equity=equity,
-                        )
-                    )
-                    open_position = None
-                    bars_since_entry = 0
-
-            # Check if we should enter a new position
-            should_enter = False
-            if open_position is None:
-                # No open position
-                if idx % trade_gap == 0:
-                    should_enter = True
-            elif not wait_for_exit:
-                # Have open position but wait_for_exit is False
-                if idx % trade_gap == 0:
-                    should_enter = True
-
-            if should_enter:
-                # If wait_for_exit is False and we have an open position, close it first
-                if open_position is not None and not wait_for_exit:
-                    entry_price = open_position["entry_price"]
-                    entry_time = open_position["entry_time"]
-                    exit_price = float(row["open"])
-                    exit_reason = "Forced Exit (New Entry)"
-
-                    pnl_points = exit_price - entry_price
-                    gross = pnl_points * qty_rupees
-                    costs = broker_fee + slippage
-                    pnl = gross - costs
-                    equity += pnl
-
-                    trades.append(
-                        TradeResult(
-                            entry_time=entry_time,
-                            exit_time=ts,
-                            symbol=symbol,
-                            side="LONG",
-                            entry=entry_price,
-                            exit=exit_price,
-                            gross_rupees=gross,
-                            costs_rupees=costs,
-                            pnl_rupees=pnl,
-                            exit_reason=exit_reason,
-                            cumulative_equity=equity,
-                        )
-                    )
-
-                # Open new position
-                entry_price = float(row["open"])
-                open_position = {
-                    "entry_price": entry_price,
-                    "entry_time": ts,
-                }
-                bars_since_entry = 0
-
-        # Close any remaining open position at the end
-        if open_position is not None:
-            last_row = df.iloc[-1]
-            entry_price = open_position["entry_price"]
-            entry_time = open_position["entry_time"]
-            exit_price = float(last_row["close"])
-            exit_reason = "End of Data"
-
-            pnl_points = exit_price - entry_price
-            gross = pnl_points * qty_rupees
-            costs = broker_fee + slippage
-            pnl = gross - costs
-            equity += pnl
-
-            trades.append(
-                TradeResult(
-                    entry_time=entry_time,
-                    exit_time=df.index[-1],
-                    symbol=symbol,
-                    side="LONG",
-                    entry=entry_price,
-                    exit=exit_price,
-                    gross_rupees=gross,
-                    costs_rupees=costs,
-                    pnl_rupees=pnl,
-                    exit_reason=exit_reason,
-                    cumulative_equity=equity,
-                )
-            )
+        costs = broker_fee + slippage
+        entry_idx, exit_idx, entry_px, exit_px, reasons, equity = _simulate_bars(
+            df["open"].to_numpy(dtype=np.float64),
+            df["high"].to_numpy(dtype=np.float64),
+            df["low"].to_numpy(dtype=np.float64),
+            df["close"].to_numpy(dtype=np.float64),
+            trade_gap,
+            profit_target,
+            stop_loss,
+            qty_rupees,
+            costs,
+            close_at_bar_close,
+            wait_for_exit,
+            float(self.starting_capital),
+        )
 
-        return trades
+        gross = (exit_px - entry_px) * qty_rupees
+        costs_rupees = np.full(len(entry_px), costs)
+        return pd.DataFrame(
+            {
+                "entry_time": df.index[entry_idx],
+                "exit_time": df.index[exit_idx],
+                "symbol": symbol,
+                "side": "LONG",
+                "entry": entry_px,
+                "exit": exit_px,
+                "gross_rupees": gross,
+                "costs_rupees": costs_rupees,
+                "pnl_rupees": gross - costs_rupees,
+                "exit_reason": [EXIT_REASONS[code] for code in reasons],
+                "cumulative_equity": equity,
+            },
+            columns=TRADE_COLUMNS,
+        )
 
     # ---------- Public API ----------
 
@@ -354,7 +349,7 @@ class RandomScalpRunner:
                 "trades": pd.DataFrame(),
                 "summary": None,
                 "daily_stats": [],
-                "output_csv": None,
+                "output_path": None,
                 "message": "⚠️ No valid symbols resolved for this configuration.",
             }
 
@@ -374,9 +369,8 @@ class RandomScalpRunner:
             trades = self._simulate_symbol(sym, df)
             logger.info(f"RandomScalp: Generated {len(trades)} trades for {sym}")
 
-            if trades:
-                trades_df = pd.DataFrame([t.__dict__ for t in trades])
-                all_trades.append(trades_df)
+            if not trades.empty:
+                all_trades.append(trades)
 
         if not all_trades:
             msg = f"⚠️ No trades generated. Loaded data for {len(combined_data)} symbols, but no trades occurred. Check parameters."
@@ -386,7 +380,7 @@ class RandomScalpRunner:
                 "trades": pd.DataFrame(),
                 "summary": None,
                 "daily_stats": [],
-                "output_csv": None,
+                "output_path": None,
                 "message": msg,
             }
 
@@ -397,18 +391,17 @@ class RandomScalpRunner:
         summary = summarize_trades(trades_df.copy(), starting_capital=self.starting_capital)
         daily_stats = daily_breakdown(trades_df.copy())
 
-        out_csv = None
+        out_path = None
         if write_csv:
             symbol_suffix = "_".join(symbols) if len(symbols) > 1 else symbols[0]
-            out_csv = f"random_scalp_results_{symbol_suffix}_{self.interval}.csv"
-            trades_df.to_csv(out_csv, index=False)
+            out_path = write_trades(trades_df, f"random_scalp_results_{symbol_suffix}_{self.interval}")
 
         return {
             "data": combined_data,
             "trades": trades_df,
             "summary": summary,
             "daily_stats": daily_stats,
-            "output_csv": out_csv,
+            "output_path": out_path,
         }
 
 
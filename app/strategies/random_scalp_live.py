@@ -17,15 +17,16 @@ Key differences from original random_scalp.py:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+from numba import njit
 import numpy as np
 import pandas as pd
 from pydantic import BaseModel, Field, ConfigDict
 
 from tsdb_pipeline import read_ohlcv_from_tsdb
 from symbol_utils import get_option_pair, is_option_symbol
+from trade_io import write_trades
 
 
 # ==================== STRATEGY METADATA ====================
@@ -104,19 +105,134 @@ def get_info() -> Dict[str, Any]:
 
 # ==================== CORE STRATEGY ====================
 
-@dataclass
-class TradeResult:
-    entry_time: pd.Timestamp
-    exit_time: pd.Timestamp
-    symbol: str
-    side: str
-    entry: float
-    exit: float
-    gross_rupees: float
-    costs_rupees: float
-    pnl_rupees: float
-    exit_reason: str
-    cumulative_equity: float
+TRADE_COLUMNS = [
+    "entry_time",
+    "exit_time",
+    "symbol",
+    "side",
+    "entry",
+    "exit",
+    "gross_rupees",
+    "costs_rupees",
+    "pnl_rupees",
+    "exit_reason",
+    "cumulative_equity",
+]
+
+EXIT_REASONS = ("Target Hit", "Stoploss Hit", "Close @ Bar End", "Forced Exit (New Entry)", "End of Data")
+_TARGET, _STOPLOSS, _BAR_END, _FORCED, _END_OF_DATA = range(5)
+
+
+@njit(cache=True)
+def _simulate_bars(
+    open_, high, low, close, trade_gap, profit_target, stop_loss,
+    qty_rupees, costs, close_at_bar_close, wait_for_exit, starting_capital,
+):
+    """
+    Live-aligned simulation over plain arrays: a signal at bar N's close is
+    queued and filled at bar N+1's open. Exits are checked first on each bar.
+    Returns (entry_idx, exit_idx, entry, exit, reason_code, equity).
+    """
+    n = len(close)
+    max_trades = n + 1
+    entry_idx = np.empty(max_trades, dtype=np.int64)
+    exit_idx = np.empty(max_trades, dtype=np.int64)
+    entry_px = np.empty(max_trades, dtype=np.float64)
+    exit_px = np.empty(max_trades, dtype=np.float64)
+    reasons = np.empty(max_trades, dtype=np.int64)
+    equity_curve = np.empty(max_trades, dtype=np.float64)
+
+    equity = starting_capital
+    count = 0
+    in_position = False
+    entry = 0.0
+    entry_at = 0
+    bar_counter = 0
+    pending_signal = False
+    next_entry_bar_idx = -1
+
+    for i in range(n):
+        # Check if we have an open position that needs to be checked for exit
+        if in_position:
+            target_price = entry + profit_target
+            reason = -1
+            px = 0.0
+            # Assumption: if both hit in same bar, target takes precedence (more favorable)
+            if high[i] >= target_price:
+                px = target_price
+                reason = _TARGET
+            elif stop_loss > 0 and low[i] <= entry - stop_loss:
+                px = entry - stop_loss
+                reason = _STOPLOSS
+            elif close_at_bar_close:
+                px = close[i]
+                reason = _BAR_END
+
+            if reason >= 0:
+                equity += (px - entry) * qty_rupees - costs
+                entry_idx[count] = entry_at
+                exit_idx[count] = i
+                entry_px[count] = entry
+                exit_px[count] = px
+                reasons[count] = reason
+                equity_curve[count] = equity
+                count += 1
+                in_position = False
+                pending_signal = False
+                next_entry_bar_idx = -1
+
+        # Signal generation at bar close; entry is scheduled for the next bar open
+        bar_counter += 1
+        if bar_counter % trade_gap == 0 and (not wait_for_exit or not in_position):
+            if i + 1 < n:
+                pending_signal = True
+                next_entry_bar_idx = i + 1
+
+        # Execute pending entry at bar open (if this is the scheduled entry bar)
+        if pending_signal and next_entry_bar_idx == i:
+            if in_position and not wait_for_exit:
+                px = open_[i]
+                equity += (px - entry) * qty_rupees - costs
+                entry_idx[count] = entry_at
+                exit_idx[count] = i
+                entry_px[count] = entry
+                exit_px[count] = px
+                reasons[count] = _FORCED
+                equity_curve[count] = equity
+                count += 1
+            in_position = True
+            entry = open_[i]
+            entry_at = i
+            pending_signal = False
+            next_entry_bar_idx = -1
+
+    # Close any remaining open position at the end
+    if in_position:
+        px = close[n - 1]
+        equity += (px - entry) * qty_rupees - costs
+        entry_idx[count] = entry_at
+        exit_idx[count] = n - 1
+        entry_px[count] = entry
+        exit_px[count] = px
+        reasons[count] = _END_OF_DATA
+        equity_curve[count] = equity
+        count += 1
+
+    return (
+        entry_idx[:count], exit_idx[:count], entry_px[:count],
+        exit_px[:count], reasons[:count], equity_curve[:count],
+    )
+
+
+def warm_up() -> None:
+    """Compile `_simulate_bars` on a tiny input so the first backtest skips the JIT stall."""
+    base = np.array([100.0, 101.0, 102.0, 101.5])
+    # pandas copy-on-write hands out read-only column arrays; compile both variants
+    for writeable in (True, False):
+        ohlc = [base.copy() for _ in range(4)]
+        for arr in ohlc:
+            arr.setflags(write=writeable)
+        _simulate_bars(*ohlc, 1, 1.0, 0.5, 1.0, 0.0, True, False, 100_000.0)
 
 
 class RandomScalpLiveRunner:
@@ -191,7 +307,7 @@ class RandomScalpLiveRunner:
 
     # ---------- Trade Simulation ----------
 
-    def _simulate_symbol(self, symbol: str, df: pd.DataFrame) -> List[TradeResult]:
+    def _simulate_symbol(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
         """
         Live-aligned simulation:
         - Signal generated at bar N close
@@ -199,9 +315,6 @@ class RandomScalpLiveRunner:
         - Position held until TP/SL hit (across multiple bars if needed)
         - Only one position at a time (if wait_for_exit=True)
         """
-        trades: List[TradeResult] = []
-        equity = float(self.starting_capital)
-
         profit_target = float(self.params.profit_target_rupees)
         stop_loss = float(self.params.stop_loss_rupees)
         trade_gap = max(int(self.params.trade_every_n_bars), 1)
@@ -219,166 +332,44 @@ class RandomScalpLiveRunner:
         if df.empty:
             import logging
             logging.warning(f"RandomScalpLive: No data loaded for {symbol}")
-            return trades
+            return pd.DataFrame(columns=TRADE_COLUMNS)
 
         import logging
         logging.info(f"RandomScalpLive: Simulating {symbol} with {len(df)} bars, trade_gap={trade_gap}")
 
-        # State tracking
-        bar_counter = 0
-        pending_signal = False
-        next_entry_bar_idx = None
-        open_position = None
-
-        for idx, (ts, row) in enumerate(df.iterrows()):
-            # Check if we have an open position that needs to be checked for exit
-            if open_position is not None:
-                entry_price = open_position["entry_price"]
-                entry_time = open_position["entry_time"]
-                target_price = entry_price + profit_target
-                stop_price = entry_price - stop_loss if stop_loss > 0 else None
-
-                high = float(row["high"])
-                low = float(row["low"])
-
-                exit_price = None
-                exit_reason = None
-
-                # Check if target or stoploss hit during this bar
-                # Assumption: if both hit in same bar, target takes precedence (more favorable)
-                if high >= target_price:
-                    exit_price = target_price
-                    exit_reason = "Target Hit"
-                elif stop_price is not None and low <= stop_price:
-                    exit_price = stop_price
-                    exit_reason = "Stoploss Hit"
-                elif close_at_bar_close:
-                    # Close at bar close if option is enabled
-                    exit_price = float(row["close"])
-                    exit_reason = "Close @ Bar End"
-
-                # If we have an exit, record the trade
-                if exit_price is not None:
-                    pnl_points = exit_price - entry_price
-                    gross = pnl_points * qty_rupees
-                    costs = total_costs_per_trade
-                    pnl = gross - costs
-                    equity += pnl
-
-                    trades.append(
-                        TradeResult(
-                            entry_time=entry_time,
-                            exit_time=ts,
-                            symbol=symbol,
-                            side="LONG",
-                            entry=entry_price,
-                            exit=exit_price,
-                            gross_rupees=gross,
-                            costs_rupees=costs,
-                            pnl_rupees=pnl,
-                            exit_reason=exit_reason,
-                            cumulative_equity=equity,
-                        )
-                    )
-                    open_position = None
-                    pending_signal = False
-                    next_entry_bar_idx = None
-
-            # Live behavior: signal generation at bar close
-            # This happens BEFORE entry execution (which is at next bar open)
-            bar_counter += 1
-
-            # Check if we should generate a signal at this bar's close
-            should_generate_signal = False
-            if bar_counter % trade_gap == 0:
-                # Signal condition met
-                if wait_for_exit:
-                    # Only generate signal if no open position
-                    if open_position is None:
-                        should_generate_signal = True
-                else:
-                    # Generate signal regardless of position (original behavior)
-                    should_generate_signal = True
-
-            if should_generate_signal:
-                # Signal generated at bar close, schedule entry for next bar
-                if idx + 1 < len(df):
-                    pending_signal = True
-                    next_entry_bar_idx = idx + 1
-                    # In live, this logs: "⚡ [SIGNAL] LONG queued for next bar open"
-
-            # Execute pending entry at bar open (if this is the scheduled entry bar)
-            if pending_signal and next_entry_bar_idx == idx:
-                # If wait_for_exit is False and we have an open position, close it first
-                if open_position is not None and not wait_for_exit:
-                    entry_price = open_position["entry_price"]
-                    entry_time = open_position["entry_time"]
-                    exit_price = float(row["open"])
-                    exit_reason = "Forced Exit (New Entry)"
-
-                    pnl_points = exit_price - entry_price
-                    gross = pnl_points * qty_rupees
-                    costs = total_costs_per_trade
-                    pnl = gross - costs
-                    equity += pnl
-
-                    trades.append(
-                        TradeResult(
-                            entry_time=entry_time,
-                            exit_time=ts,
-                            symbol=symbol,
-                            side="LONG",
-                            entry=entry_price,
-                            exit=exit_price,
-                            gross_rupees=gross,
-                            costs_rupees=costs,
-                            pnl_rupees=pnl,
-                            exit_reason=exit_reason,
-                            cumulative_equity=equity,
-                        )
-                    )
-
-                # Execute entry at bar open
-                entry_price = float(row["open"])
-                open_position = {
-                    "entry_price": entry_price,
-                    "entry_time": ts,
-                }
-                pending_signal = False
-                next_entry_bar_idx = None
-                # In live, this logs: "🚀 [ENTRY] BUY {symbol} x {qty}"
-
-        # Close any remaining open position at the end
-        if open_position is not None:
-            last_row = df.iloc[-1]
-            entry_price = open_position["entry_price"]
-            entry_time = open_position["entry_time"]
-            exit_price = float(last_row["close"])
-            exit_reason = "End of Data"
-
-            pnl_points = exit_price - entry_price
-            gross = pnl_points * qty_rupees
-            costs = total_costs_per_trade
-            pnl = gross - costs
-            equity += pnl
-
-            trades.append(
-                TradeResult(
-                    entry_time=entry_time,
-                    exit_time=df.index[-1],
-                    symbol=symbol,
-                    side="LONG",
-                    entry=entry_price,
-                    exit=exit_price,
-                    gross_rupees=gross,
-                    costs_rupees=costs,
-                    pnl_rupees=pnl,
-                    exit_reason=exit_reason,
-                    cumulative_equity=equity,
-                )
-            )
+        entry_idx, exit_idx, entry_px, exit_px, reasons, equity = _simulate_bars(
+            df["open"].to_numpy(dtype=np.float64),
+            df["high"].to_numpy(dtype=np.float64),
+            df["low"].to_numpy(dtype=np.float64),
+            df["close"].to_numpy(dtype=np.float64),
+            trade_gap,
+            profit_target,
+            stop_loss,
+            qty_rupees,
+            total_costs_per_trade,
+            close_at_bar_close,
+            wait_for_exit,
+            float(self.starting_capital),
+        )
 
-        return trades
+        gross = (exit_px - entry_px) * qty_rupees
+        costs_rupees = np.full(len(entry_px), total_costs_per_trade)
+        return pd.DataFrame(
+            {
+                "entry_time": df.index[entry_idx],
+                "exit_time": df.index[exit_idx],
+                "symbol": symbol,
+                "side": "LONG",
+                "entry": entry_px,
+                "exit": exit_px,
+                "gross_rupees": gross,
+                "costs_rupees": costs_rupees,
+                "pnl_rupees": gross - costs_rupees,
+                "exit_reason": [EXIT_REASONS[code] for code in reasons],
+                "cumulative_equity": equity,
+            },
+            columns=TRADE_COLUMNS,
+        )
 
     # ---------- Public API ----------
 
@@ -395,7 +386,7 @@ class RandomScalpLiveRunner:
                 "trades": pd.DataFrame(),
                 "summary": None,
                 "daily_stats": [],
-                "output_csv": None,
+                "output_path": None,
                 "message": "⚠️ No valid symbols resolved for this configuration.",
             }
 
@@ -415,9 +406,8 @@ class RandomScalpLiveRunner:
             trades = self._simulate_symbol(sym, df)
             logger.info(f"RandomScalpLive: Generated {len(trades)} trades for {sym}")
 
-            if trades:
-                trades_df = pd.DataFrame([t.__dict__ for t in trades])
-                all_trades.append(trades_df)
+            if not trades.empty:
+                all_trades.append(trades)
 
         if not all_trades:
             msg = f"⚠️ No trades generated. Loaded data for {len(combined_data)} symbols, but no trades occurred. Check parameters."
@@ -427,7 +417,7 @@ class RandomScalpLiveRunner:
                 "trades": pd.DataFrame(),
                 "summary": None,
                 "daily_stats": [],
-                "output_csv": None,
+                "output_path": None,
                 "message": msg,
             }
 
@@ -438,18 +428,17 @@ class RandomScalpLiveRunner:
         summary = summarize_trades(trades_df.copy(), starting_capital=self.starting_capital)
         daily_stats = daily_breakdown(trades_df.copy())
 
-        out_csv = None
+        out_path = None
         if write_csv:
             symbol_suffix = "_".join(symbols) if len(symbols) > 1 else symbols[0]
-            out_csv = f"random_scalp_live_results_{symbol_suffix}_{self.interval}.csv"
-            trades_df.to_csv(out_csv, index=False)
+            out_path = write_trades(trades_df, f"random_scalp_live_results_{symbol_suffix}_{self.interval}")
 
         return {
             "data": combined_data,
             "trades": trades_df,
             "summary": summary,
             "daily_stats": daily_stats,
-            "output_csv": out_csv,
+            "output_path": out_path,
         }
 
 
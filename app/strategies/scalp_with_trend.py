@@ -6,15 +6,18 @@ Scalp-with-Trend Backtest (multi-bar hold; intraday square-off)
 """
 
 from datetime import time
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 from enum import Enum
 
+from numba import njit
 import numpy as np
 import pandas as pd
 from pydantic import BaseModel, Field
 
 from tsdb_pipeline import read_ohlcv_from_tsdb
 from symbol_utils import get_option_pair, is_option_symbol
+from trade_io import write_trades
 
 # ==================== STRATEGY DEFINITION ====================
 
@@ -56,6 +59,185 @@ def get_info() -> Dict[str, Any]:
 
 # ==================== STRATEGY IMPLEMENTATION ====================
 
+# Sweeps construct a runner per job with the same time strings, so the
+# parsed values are memoized on the raw input.
+@lru_cache(maxsize=256)
+def _parse_hhmm(value: str) -> time:
+    hh, mm = map(int, value.split(":"))
+    return time(hh, mm)
+
+
+@lru_cache(maxsize=256)
+def _parse_session_windows(key: tuple) -> tuple:
+    return tuple((_parse_hhmm(start), _parse_hhmm(end)) for start, end in key)
+
+
+def _time_to_us(value: time) -> int:
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond
+
+
+def _time_of_day_us(index: pd.DatetimeIndex) -> np.ndarray:
+    seconds = (index.hour * 60 + index.minute) * 60 + index.second
+    return seconds.to_numpy(dtype=np.int64) * 1_000_000 + index.microsecond.to_numpy(dtype=np.int64)
+
+
+# Exit bar path -> kernel code; "color" picks low-first/high-first per bar.
+EXIT_PATH_CODES = {"color": 0, "bull": 1, "bear": 2, "worst": 3}
+EXIT_REASONS = ("Target Hit", "Stoploss Hit", "Square-off EOD")
+_TARGET, _STOPLOSS, _SQUARE_OFF = 0, 1, 2
+
+
+@njit(cache=True)
+def _simulate_bars(
+    open_, high, low, close, ema_fast, ema_slow, atr,
+    in_session, square_off, day_codes,
+    atr_min_points, target_points, stoploss_points,
+    allow_long, allow_short, confirm_trend_at_entry, path_code,
+    qty_per_point, costs_rupees, daily_loss_cap, starting_capital,
+):
+    """
+    Bar-by-bar simulation over plain arrays. Signals on bar i enter at the
+    open of bar i + 1; exits are checked from the bar after entry onward.
+    Returns (entry_idx, exit_idx, side, entry, exit, reason_code, equity).
+    """
+    n = len(close)
+    max_trades = n // 2 + 1
+    entry_idx = np.empty(max_trades, dtype=np.int64)
+    exit_idx = np.empty(max_trades, dtype=np.int64)
+    sides = np.empty(max_trades, dtype=np.int64)
+    entry_px = np.empty(max_trades, dtype=np.float64)
+    exit_px = np.empty(max_trades, dtype=np.float64)
+    reasons = np.empty(max_trades, dtype=np.int64)
+    equity_curve = np.empty(max_trades, dtype=np.float64)
+
+    n_days = day_codes.max() + 1
+    day_pnl = np.zeros(n_days, dtype=np.float64)
+    day_stopped = np.zeros(n_days, dtype=np.bool_)
+
+    equity = starting_capital
+    count = 0
+    in_position = False
+    side = 0
+    entry = 0.0
+    entry_at = 0
+    tp = 0.0
+    sl = 0.0
+
+    i = 1
+    while i < n:
+        if in_position:
+            h = high[i]
+            l = low[i]
+            if side == 1:
+                hit_tp = h >= tp
+                hit_sl = l <= sl
+            else:
+                hit_tp = l <= tp
+                hit_sl = h >= sl
+
+            exited = False
+            px = 0.0
+            reason = _TARGET
+            if hit_tp or hit_sl:
+                exited = True
+                if path_code == 3:
+                    low_first = False
+                elif path_code == 0:
+                    o = open_[i]
+                    c = close[i]
+                    low_first = (not np.isnan(o)) and (not np.isnan(c)) and c >= o
+                else:
+                    low_first = path_code == 1
+
+                if path_code == 3:
+                    stop_first = hit_sl
+                elif side == 1:
+                    stop_first = l <= sl if low_first else not (h >= tp)
+                else:
+                    stop_first = not (l <= tp) if low_first else h >= sl
+                if stop_first:
+                    px = sl
+                    reason = _STOPLOSS
+                else:
+                    px = tp
+                    reason = _TARGET
+            elif square_off[i]:
+                exited = True
+                px = close[i]
+                reason = _SQUARE_OFF
+
+            if exited:
+                pnl_points = (px - entry) if side == 1 else (entry - px)
+                pnl_rupees = pnl_points * qty_per_point - costs_rupees
+                equity += pnl_rupees
+
+                day = day_codes[i]
+                day_pnl[day] += pnl_rupees
+                if day_pnl[day] <= daily_loss_cap:
+                    day_stopped[day] = True
+
+                entry_idx[count] = entry_at
+                exit_idx[count] = i
+                sides[count] = side
+                entry_px[count] = entry
+                exit_px[count] = px
+                reasons[count] = reason
+                equity_curve[count] = equity
+                count += 1
+                in_position = False
+            i += 1
+            continue
+
+        if not day_stopped[day_codes[i]] and in_session[i] and atr[i] >= atr_min_points:
+            trend_up = ema_fast[i] > ema_slow[i]
+            trend_down = ema_fast[i] < ema_slow[i]
+            signal = 0
+            if high[i] > high[i - 1] and trend_up and allow_long:
+                signal = 1
+            elif low[i] < low[i - 1] and trend_down and allow_short:
+                signal = -1
+
+            if signal != 0:
+                if confirm_trend_at_entry and ((signal == 1 and not trend_up) or (signal == -1 and not trend_down)):
+                    i += 1
+                    continue
+                if i + 1 < n:
+                    in_position = True
+                    side = signal
+                    entry = open_[i + 1]
+                    entry_at = i + 1
+                    if side == 1:
+                        tp = entry + target_points
+                        sl = entry - stoploss_points
+                    else:
+                        tp = entry - target_points
+                        sl = entry + stoploss_points
+                    i += 2
+                    continue
+        i += 1
+
+    return (
+        entry_idx[:count], exit_idx[:count], sides[:count],
+        entry_px[:count], exit_px[:count], reasons[:count], equity_curve[:count],
+    )
+
+
+def warm_up() -> None:
+    """Compile `_simulate_bars` on a tiny input so the first backtest skips the JIT stall."""
+    base = np.array([100.0, 101.0, 102.0, 101.5])
+    flags = np.ones(len(base), dtype=np.bool_)
+    day_codes = np.zeros(len(base), dtype=np.int64)
+    # pandas copy-on-write hands out read-only column arrays; compile both variants
+    for writeable in (True, False):
+        series = [base.copy() for _ in range(7)]  # open, high, low, close, ema_fast, ema_slow, atr
+        for arr in series:
+            arr.setflags(write=writeable)
+        _simulate_bars(
+            *series, flags, ~flags, day_codes,
+            1.0, 2.0, 1.0, True, True, True, EXIT_PATH_CODES["color"], 1.0, 0.0, -1000.0, 100_000.0,
+        )
+
+
 class BacktestRunner:
     def __init__(self, config: Dict[str, Any]):
         # Core config
@@ -87,16 +269,12 @@ class BacktestRunner:
         # Other params
         self.square_off_time = time(15, 25)
         if "square_off_time" in config and config["square_off_time"]:
-            hh, mm = map(int, str(config["square_off_time"]).split(":"))
-            self.square_off_time = time(hh, mm)
+            self.square_off_time = _parse_hhmm(str(config["square_off_time"]))
 
         self.session_windows = [(time(9, 20), time(15, 5))] # Simplified default
         if "session_windows" in config and config["session_windows"]:
-            self.session_windows = []
-            for sw in config["session_windows"]:
-                h1, m1 = map(int, sw["start"].split(":"))
-                h2, m2 = map(int, sw["end"].split(":"))
-                self.session_windows.append((time(h1, m1), time(h2, m2)))
+            key = tuple((sw["start"], sw["end"]) for sw in config["session_windows"])
+            self.session_windows = list(_parse_session_windows(key))
 
         self.df = pd.DataFrame()
 
@@ -142,140 +320,68 @@ class BacktestRunner:
         _df["atr"] = _df["tr"].rolling(window=self.atr_window).mean()
         return _df
 
-    def in_session(self, ts) -> bool:
-        t = ts.time()
+    def _session_flags(self, index: pd.DatetimeIndex) -> tuple:
+        """Per-bar in-session and end-of-day square-off flags for the kernel."""
+        bar_us = _time_of_day_us(index)
+        in_session = np.zeros(len(index), dtype=np.bool_)
         for start, end in self.session_windows:
-            if start <= t <= end:
-                return True
-        return False
-
-    def trend_up(self, i: int) -> bool:
-        return self.df.iloc[i]["ema_fast"] > self.df.iloc[i]["ema_slow"]
-
-    def trend_down(self, i: int) -> bool:
-        return self.df.iloc[i]["ema_fast"] < self.df.iloc[i]["ema_slow"]
-
-    def atr_ok(self, i: int) -> bool:
-        return self.df.iloc[i]["atr"] >= self.atr_min_points
-
-    def is_last_bar_of_day(self, i: int) -> bool:
-        if i + 1 >= len(self.df):
-            return True
-        return self.df.index[i + 1].date() != self.df.index[i].date()
-
-    def past_square_off_time(self, ts) -> bool:
-        return ts.time() >= self.square_off_time
-
-    def scalp_signal(self, i: int) -> str | None:
-        if i < 1: return None
-        prev, curr = self.df.iloc[i - 1], self.df.iloc[i]
-        if not self.in_session(curr.name) or not self.atr_ok(i): return None
-
-        if (curr["high"] > prev["high"]) and self.trend_up(i):
-            if self.trade_direction in ("both", "long_only"): return "LONG"
-        if (curr["low"] < prev["low"]) and self.trend_down(i):
-            if self.trade_direction in ("both", "short_only"): return "SHORT"
-        return None
-
-    def bar_path_tuple(self, bar: pd.Series):
-        o, c = float(bar.get("open", np.nan)), float(bar.get("close", np.nan))
-        if self.exit_bar_path == "bull": return ("open", "low", "high", "close")
-        if self.exit_bar_path == "bear": return ("open", "high", "low", "close")
-        if self.exit_bar_path == "color":
-            return ("open", "low", "high", "close") if not np.isnan(o) and not np.isnan(c) and c >= o else ("open", "high", "low", "close")
-        return ("worst",)
-
-    def decide_exit_this_bar(self, position: str, bar: pd.Series, tp: float, sl: float):
-        high, low = float(bar["high"]), float(bar["low"])
-        hit_tp = high >= tp if position == "LONG" else low <= tp
-        hit_sl = low <= sl if position == "LONG" else high >= sl
-        if not hit_tp and not hit_sl: return False, None, None
-
-        path = self.bar_path_tuple(bar)
-        if path == ("worst",):
-            return (True, sl, "Stoploss Hit") if hit_sl else (True, tp, "Target Hit")
-
-        if position == "LONG":
-            if path == ("open", "low", "high", "close"):
-                if low <= sl: return True, sl, "Stoploss Hit"
-                if high >= tp: return True, tp, "Target Hit"
-            else:
-                if high >= tp: return True, tp, "Target Hit"
-                if low <= sl: return True, sl, "Stoploss Hit"
-        else: # SHORT
-            if path == ("open", "low", "high", "close"):
-                if low <= tp: return True, tp, "Target Hit"
-                if high >= sl: return True, sl, "Stoploss Hit"
-            else:
-                if high >= sl: return True, sl, "Stoploss Hit"
-                if low <= tp: return True, tp, "Target Hit"
+            in_session |= (bar_us >= _time_to_us(start)) & (bar_us <= _time_to_us(end))
 
-        return (True, sl, "Stoploss Hit") if hit_sl else (True, tp, "Target Hit")
+        day_codes, _ = pd.factorize(index.normalize())
+        day_codes = day_codes.astype(np.int64)
+        last_bar_of_day = np.ones(len(index), dtype=np.bool_)
+        last_bar_of_day[:-1] = day_codes[1:] != day_codes[:-1]
+        square_off = last_bar_of_day | (bar_us >= _time_to_us(self.square_off_time))
+        if not self.enable_eod_square_off:
+            square_off[:] = False
+        return in_session, square_off, day_codes
 
     def _run_backtest_on_df(self) -> pd.DataFrame:
-        results = []
-        equity = self.starting_capital
-        in_position, side, entry_price, entry_time, tp_level, sl_level = False, None, None, None, None, None
-        daily_pnl, loss_stopped_days = {}, set()
-
-        i = 1
-        while i < len(self.df):
-            row = self.df.iloc[i]
-            ts, d = row.name, row.name.date()
-            daily_pnl.setdefault(d, 0.0)
-            day_stopped = d in loss_stopped_days
-
-            if in_position:
-                exited, exit_px, reason = self.decide_exit_this_bar(side, row, tp_level, sl_level)
-                if not exited and self.enable_eod_square_off and (self.is_last_bar_of_day(i) or self.past_square_off_time(ts)):
-                    exited, exit_px, reason = True, float(row["close"]), "Square-off EOD"
-
-                if exited:
-                    pnl_points = (exit_px - entry_price) if side == "LONG" else (entry_price - exit_px)
-                    gross_rupees = pnl_points * self.qty_per_point
-                    costs_rupees = (self.slippage_points * self.qty_per_point * 2) + (2 * self.brokerage_per_trade)
-                    pnl_rupees = gross_rupees - costs_rupees
-                    equity += pnl_rupees
-
-                    ed = row.name.date()
-                    daily_pnl.setdefault(ed, 0.0)
-                    daily_pnl[ed] += pnl_rupees
-                    if daily_pnl[ed] <= self.daily_loss_cap:
-                        loss_stopped_days.add(ed)
-
-                    results.append({
-                        "entry_time": entry_time, "exit_time": row.name, "side": side,
-                        "entry": entry_price, "exit": exit_px, "pnl_points": pnl_points,
-                        "gross_rupees": gross_rupees, "costs_rupees": costs_rupees,
-                        "pnl_rupees": pnl_rupees, "equity": equity, "exit_reason": reason,
-                    })
-                    in_position, side, entry_price, entry_time, tp_level, sl_level = False, None, None, None, None, None
-                    i += 1
-                    continue
-
-                i += 1
-                continue
-
-            if not in_position and not day_stopped:
-                sig = self.scalp_signal(i)
-                if sig:
-                    if self.confirm_trend_at_entry:
-                        if (sig == "LONG" and not self.trend_up(i)) or (sig == "SHORT" and not self.trend_down(i)):
-                            i += 1
-                            continue
-
-                    if i + 1 < len(self.df):
-                        nb = self.df.iloc[i + 1]
-                        in_position, side, entry_price, entry_time = True, sig, float(nb["open"]), nb.name
-                        if side == "LONG":
-                            tp_level, sl_level = entry_price + self.target_points, entry_price - self.stoploss_points
-                        else:
-                            tp_level, sl_level = entry_price - self.target_points, entry_price + self.stoploss_points
-                        i += 2
-                        continue
-            i += 1
-
-        return pd.DataFrame(results)
+        df = self.df
+        if len(df) < 2:
+            return pd.DataFrame()
+
+        in_session, square_off, day_codes = self._session_flags(df.index)
+        costs_rupees = (self.slippage_points * self.qty_per_point * 2) + (2 * self.brokerage_per_trade)
+
+        entry_idx, exit_idx, sides, entry_px, exit_px, reasons, equity = _simulate_bars(
+            df["open"].to_numpy(dtype=np.float64),
+            df["high"].to_numpy(dtype=np.float64),
+            df["low"].to_numpy(dtype=np.float64),
+            df["close"].to_numpy(dtype=np.float64),
+            df["ema_fast"].to_numpy(dtype=np.float64),
+            df["ema_slow"].to_numpy(dtype=np.float64),
+            df["atr"].to_numpy(dtype=np.float64),
+            in_session,
+            square_off,
+            day_codes,
+            float(self.atr_min_points),
+            float(self.target_points),
+            float(self.stoploss_points),
+            self.trade_direction in ("both", "long_only"),
+            self.trade_direction in ("both", "short_only"),
+            bool(self.confirm_trend_at_entry),
+            EXIT_PATH_CODES[self.exit_bar_path],
+            float(self.qty_per_point),
+            float(costs_rupees),
+            float(self.daily_loss_cap),
+            float(self.starting_capital),
+        )
+        if len(entry_idx) == 0:
+            return pd.DataFrame()
+
+        pnl_points = np.where(sides == 1, exit_px - entry_px, entry_px - exit_px)
+        gross_rupees = pnl_points * float(self.qty_per_point)
+        costs = np.full(len(sides), float(costs_rupees))
+        trades = pd.DataFrame({
+            "entry_time": df.index[entry_idx], "exit_time": df.index[exit_idx],
+            "side": np.where(sides == 1, "LONG", "SHORT"),
+            "entry": entry_px, "exit": exit_px, "pnl_points": pnl_points,
+            "gross_rupees": gross_rupees, "costs_rupees": costs,
+            "pnl_rupees": gross_rupees - costs, "equity": equity,
+            "exit_reason": [EXIT_REASONS[code] for code in reasons],
+        })
+        return trades
 
     def execute(self, write_csv: bool = False) -> Dict[str, Any]:
         symbols_to_test = []
@@ -304,42 +410,40 @@ class BacktestRunner:
         if not all_trades:
             return {
                 "trades": pd.DataFrame(), "summary": None, "daily_stats": [],
-                "output_csv": None, "message": "⚠️ No trades generated for any symbol.",
+                "output_path": None, "message": "⚠️ No trades generated for any symbol.",
             }
 
         combined_trades = pd.concat(all_trades, ignore_index=True).sort_values("entry_time").reset_index(drop=True)
         summary = self.summarize_trades(combined_trades.copy())
         daily_stats = self.daily_breakdown(combined_trades.copy())
 
-        out_csv = None
+        out_path = None
         if write_csv:
             symbol_suffix = "_".join(symbols_to_test) if len(symbols_to_test) > 1 else symbols_to_test[0]
-            out_csv = f"scalp_with_trend_results_{symbol_suffix}_{self.interval}.csv"
-            combined_trades.to_csv(out_csv, index=False)
+            out_path = write_trades(combined_trades, f"scalp_with_trend_results_{symbol_suffix}_{self.interval}")
 
         return {
             "trades": combined_trades, "summary": summary,
-            "daily_stats": daily_stats, "output_csv": out_csv,
+            "daily_stats": daily_stats, "output_path": out_path,
         }
 
     def summarize_trades(self, trades: pd.DataFrame) -> Dict[str, Any]:
         if trades.empty: return {}
         total = len(trades)
-        wins = int((trades["pnl_rupees"] > 0).sum())
-        losses = int((trades["pnl_rupees"] < 0).sum())
+        pnl = trades["pnl_rupees"].to_numpy(dtype=np.float64)
+        wins = int((pnl > 0).sum())
+        losses = int((pnl < 0).sum())
         flats = total - wins - losses
         winrate = wins / total * 100 if total else 0.0
 
-        net_pnl = float(trades["pnl_rupees"].sum())
+        net_pnl = float(pnl.sum())
         roi = net_pnl / self.starting_capital * 100 if self.starting_capital else 0.0
 
-        trades["cum"] = trades["pnl_rupees"].cumsum()
-        trades["peak"] = trades["cum"].cummax()
-        trades["dd"] = trades["cum"] - trades["peak"]
-        max_dd = float(trades["dd"].min())
+        cum = np.cumsum(pnl)
+        max_dd = float((cum - np.maximum.accumulate(cum)).min())
 
-        avg_win = float(trades.loc[trades["pnl_rupees"] > 0, "pnl_rupees"].mean() if wins else 0.0)
-        avg_loss = float(trades.loc[trades["pnl_rupees"] < 0, "pnl_rupees"].mean() if losses else 0.0)
+        avg_win = float(pnl[pnl > 0].mean()) if wins else 0.0
+        avg_loss = float(pnl[pnl < 0].mean()) if losses else 0.0
         rr = abs(avg_win / avg_loss) if avg_loss else 0.0
 
         return {
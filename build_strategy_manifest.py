@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Build app/strategies/_manifest.json for lazy strategy loading.
+
+The manifest lists each strategy module together with its get_info()
+payload, so the API can serve /strategies and validate strategy names at
+startup without importing every strategy module. It also records the
+mtime of every module file it scanned; the apps ignore a manifest whose
+listing no longer matches app/strategies (see `stale_manifest_reason`) and
+scan the directory instead. Re-run this after adding or changing a strategy:
+
+    python build_strategy_manifest.py
+"""
+
+import importlib
+import json
+import pkgutil
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent
+STRATEGIES_PATH = ROOT_DIR / "app" / "strategies"
+MANIFEST_PATH = STRATEGIES_PATH / "_manifest.json"
+
+
+def strategy_sources() -> Dict[str, int]:
+    """mtime_ns of each module file in app/strategies, keyed by module name."""
+    return {
+        path.stem: path.stat().st_mtime_ns
+        for path in STRATEGIES_PATH.glob("*.py")
+        if not path.name.startswith("_")
+    }
+
+
+def stale_manifest_reason(manifest: Dict[str, Any]) -> Optional[str]:
+    """Why a loaded manifest no longer describes app/strategies, or None if it still does."""
+    recorded = manifest.get("sources")
+    if not isinstance(recorded, dict):
+        return "it has no source listing"
+    current = strategy_sources()
+    added = sorted(current.keys() - recorded.keys())
+    if added:
+        return f"new modules {', '.join(added)}"
+    removed = sorted(recorded.keys() - current.keys())
+    if removed:
+        return f"removed modules {', '.join(removed)}"
+    changed = sorted(name for name, mtime_ns in current.items() if recorded[name] != mtime_ns)
+    if changed:
+        return f"modified modules {', '.join(changed)}"
+    return None
+
+
+def build_manifest() -> dict:
+    sources = strategy_sources()
+    entries = []
+    for _, name, ispkg in pkgutil.iter_modules([str(STRATEGIES_PATH)]):
+        if ispkg or name.startswith("_"):
+            continue
+        module_path = f"app.strategies.{name}"
+        module = importlib.import_module(module_path)
+        if not (hasattr(module, "get_info") and hasattr(module, "run")):
+            continue
+        info = module.get_info()
+        if info.get("name"):
+            entries.append({"module": module_path, "info": info})
+    return {"strategies": entries, "sources": sources}
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.path.insert(0, str(ROOT_DIR))
+    manifest = build_manifest()
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"✅ Wrote {len(manifest['strategies'])} strategies to {MANIFEST_PATH}")
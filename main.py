@@ -1,31 +1,93 @@
+import asyncio
 from pathlib import Path
-import numbers
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 import importlib
+import json
 import pkgutil
 
+import numpy as np
+import orjson
 import pandas as pd
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
+from build_strategy_manifest import stale_manifest_reason
 from symbol_utils import get_option_pair, is_option_symbol
 from tsdb_pipeline import (
+    FETCH_WORKERS,
     fetch_history_to_tsdb,
     list_available_series,
     delete_series,
     read_ohlcv_from_tsdb,
-    get_series_coverage,
+)
+from trade_io import output_fields
+from web_common import (
+    IST_TZ,
+    ORJSONResponse,
+    cached_coverage,
+    frame_to_records,
+    invalidate_coverage,
+    ist_iso_column,
+    render_page,
+    serialize_trades,
+    to_ist_timestamp,
 )
 
 # --- Strategy Loader ---
 
 STRATEGIES: Dict[str, Dict[str, Any]] = {}
+# Pre-encoded `/strategies` body; strategy metadata is static once loaded.
+_STRATEGIES_INFO_PAYLOAD: bytes = b"[]"
+
+
+STRATEGY_MANIFEST_PATH = Path(__file__).resolve().parent / "app" / "strategies" / "_manifest.json"
+
+
+def _load_strategy_manifest() -> Optional[List[Dict[str, Any]]]:
+    """Read the build-time manifest written by build_strategy_manifest.py, if present."""
+    if not STRATEGY_MANIFEST_PATH.exists():
+        return None
+    try:
+        manifest = json.loads(STRATEGY_MANIFEST_PATH.read_text(encoding="utf-8"))
+        entries = manifest["strategies"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  Ignoring unreadable strategy manifest {STRATEGY_MANIFEST_PATH}: {e}")
+        return None
+    stale = stale_manifest_reason(manifest)
+    if stale:
+        print(f"⚠️  Strategy manifest {STRATEGY_MANIFEST_PATH} is stale ({stale}); scanning strategies instead")
+        return None
+    return entries
 
 
 def load_strategies() -> None:
+    """
+    Register strategies from app/strategies.
+
+    With a manifest only the metadata is registered and each module is
+    imported on first use (see `_get_strategy_runner`); otherwise every
+    module is discovered and imported eagerly.
+    """
+    manifest = _load_strategy_manifest()
+    if manifest is not None:
+        for entry in manifest:
+            info = entry["info"]
+            strategy_name = info.get("name")
+            if strategy_name:
+                STRATEGIES[strategy_name] = {"info": info, "module": entry["module"]}
+                print(f"✅ Registered strategy: {info.get('title', strategy_name)}")
+    else:
+        _discover_strategies()
+
+    global _STRATEGIES_INFO_PAYLOAD
+    _STRATEGIES_INFO_PAYLOAD = orjson.dumps([s["info"] for s in STRATEGIES.values()])
+
+
+def _discover_strategies() -> None:
     """Dynamically discover and load strategies from app/strategies."""
     root_dir = Path(__file__).resolve().parent
     strategies_path = root_dir / "app" / "strategies"
@@ -44,6 +106,7 @@ def load_strategies() -> None:
                     if strategy_name:
                         STRATEGIES[strategy_name] = {
                             "info": info,
+                            "module": module.__name__,
                             "run": module.run,
                         }
                         print(f"✅ Loaded strategy: {info.get('title', strategy_name)}")
@@ -51,59 +114,13 @@ def load_strategies() -> None:
                 print(f"⚠️ Failed to load strategy from {name}.py: {e}")
 
 
-TRADE_COLUMNS = [
-    "entry_time",
-    "exit_time",
-    "symbol",
-    "side",
-    "entry",
-    "exit",
-    "gross_rupees",
-    "costs_rupees",
-    "pnl_rupees",
-    "exit_reason",
-]
-
-
-def _to_ist_iso(value: Any) -> Optional[str]:
-    if value in (None, ""):
-        return None
-    if not isinstance(value, pd.Timestamp):
-        try:
-            value = pd.to_datetime(value)
-        except (TypeError, ValueError):
-            return None
-    if value.tzinfo is None:
-        value = value.tz_localize("UTC")
-    return value.tz_convert("Asia/Kolkata").isoformat()
-
-
-def _serialize_trades(trades: pd.DataFrame, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-    if trades.empty:
-        return []
-
-    available_cols = [c for c in TRADE_COLUMNS if c in trades.columns]
-    frame = trades[available_cols].copy()
-    if limit:
-        frame = frame.tail(limit)
-
-    records = frame.to_dict(orient="records")
-    for record in records:
-        for time_field in ("entry_time", "exit_time"):
-            record[time_field] = _to_ist_iso(record.get(time_field))
-        for key, value in list(record.items()):
-            if value is None or value == "":
-                record[key] = None
-                continue
-            if isinstance(value, numbers.Integral):
-                record[key] = int(value)
-            elif isinstance(value, numbers.Number):
-                record[key] = float(value)
-            elif pd.isna(value):
-                record[key] = None
-            else:
-                record[key] = value
-    return records
+def _get_strategy_runner(strategy_name: str) -> Callable[..., Dict[str, Any]]:
+    """Return the strategy's `run`, importing its module on first use."""
+    entry = STRATEGIES[strategy_name]
+    run = entry.get("run")
+    if run is None:
+        run = entry["run"] = importlib.import_module(entry["module"]).run
+    return run
 
 
 class FetchRequest(BaseModel):
@@ -144,13 +161,22 @@ class BacktestRequest(BaseModel):
     )
     write_csv: bool = Field(
         default=False,
-        description="Persist trades CSV alongside JSON summary",
+        description="Persist trades (CSV, or Parquet with TRADES_OUTPUT_FORMAT=parquet) alongside JSON summary",
     )
     last_n_trades: int = Field(default=10, ge=1, le=200, description="Trades to include in response")
+    include_all_trades: bool = Field(
+        default=True,
+        description="Serialize every trade into trades_all; set false to return only the last N",
+    )
     strategy_params: Dict[str, Any] = Field(default_factory=dict, description="Dynamic parameters for the selected strategy")
 
-    class Config:
-        allow_population_by_field_name = True
+    model_config = ConfigDict(populate_by_name=True)
+
+
+# Request fields that steer the endpoint rather than feed the strategy config
+BACKTEST_CONTROL_FIELDS = frozenset(
+    {"strategy_name", "strategy_params", "write_csv", "last_n_trades", "include_all_trades"}
+)
 
 
 class FetchEvent(BaseModel):
@@ -166,14 +192,23 @@ class BacktestResponse(BaseModel):
     trades_tail: List[Dict[str, Any]]
     trades_all: List[Dict[str, Any]]
     daily_stats: List[Dict[str, Any]]
+    output_path: Optional[str] = None
+    output_format: Optional[str] = None
     output_csv: Optional[str] = None
     fetch_events: List[FetchEvent] = Field(default_factory=list)
 
 
-app = FastAPI(title="Timescale Gravity API", version="1.0.0")
+app = FastAPI(
+    title="Timescale Gravity API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
+# Trade and OHLCV payloads are repetitive JSON and compress well
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 BASE_DIR = Path(__file__).resolve().parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "app" / "templates"))
+TEMPLATES_DIR = BASE_DIR / "app" / "templates"
+templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "app" / "static")), name="static")
 
 
@@ -181,25 +216,28 @@ app.mount("/static", StaticFiles(directory=str(BASE_DIR / "app" / "static")), na
 def on_startup():
     load_strategies()
 
+
 @app.get("/", response_class=HTMLResponse)
-def index(request: Request):
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-        },
-    )
+def index() -> HTMLResponse:
+    return render_page(templates, TEMPLATES_DIR, "index.html")
+
+
+_HEALTH_RESPONSE = Response(content=b'{"status":"ok"}', media_type="application/json")
 
 
 @app.get("/health")
-def health() -> Dict[str, str]:
-    return {"status": "ok"}
+def health() -> Response:
+    return _HEALTH_RESPONSE
 
 
 @app.get("/strategies", response_model=List[Dict[str, Any]])
 def get_strategies():
     """Returns a list of available strategies and their parameters."""
-    return [s["info"] for s in STRATEGIES.values()]
+    return Response(
+        content=_STRATEGIES_INFO_PAYLOAD,
+        media_type="application/json",
+        headers={"Cache-Control": "max-age=300"},
+    )
 
 
 @app.get("/inventory", response_model=list[InventoryItem])
@@ -214,11 +252,13 @@ def inventory(sort_order: str = "asc"):
     if order not in {"asc", "desc"}:
         raise HTTPException(status_code=400, detail="sort_order must be 'asc' or 'desc'")
 
-    return list_available_series(sort_order=order)
+    # Returning the response directly skips re-validating rows against InventoryItem;
+    # response_model stays for the OpenAPI schema.
+    return ORJSONResponse(list_available_series(sort_order=order))
 
 
 @app.delete("/inventory/{symbol}/{exchange}/{interval}")
-def delete_inventory(symbol: str, exchange: str, interval: str):
+async def delete_inventory(symbol: str, exchange: str, interval: str):
     """
     Delete all data for a specific series.
 
@@ -228,52 +268,102 @@ def delete_inventory(symbol: str, exchange: str, interval: str):
         interval: Interval
     """
     try:
-        rows_deleted = delete_series(symbol, exchange, interval)
+        rows_deleted = await asyncio.to_thread(delete_series, symbol, exchange, interval)
+        invalidate_coverage(symbol, exchange, interval)
         return {"rows_deleted": rows_deleted, "message": f"Deleted {rows_deleted} rows for {symbol} {exchange} {interval}"}
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
+DATA_STREAM_CHUNK_ROWS = 5000
+
+
+def _iter_json_records(df: pd.DataFrame, chunk_rows: int = DATA_STREAM_CHUNK_ROWS) -> Iterator[bytes]:
+    """Yield the frame as a JSON array of records, encoding `chunk_rows` rows at a time."""
+    col_names = list(df.columns)
+    yield b"["
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        records = [dict(zip(col_names, row)) for row in chunk.itertuples(index=False, name=None)]
+        if start:
+            yield b","
+        # Strip the chunk's own brackets so the pieces join into one array
+        yield orjson.dumps(records, option=orjson.OPT_SERIALIZE_NUMPY)[1:-1]
+    yield b"]"
+
+
 @app.get("/data/{symbol}/{exchange}/{interval}", response_model=List[Dict[str, Any]])
-def get_data_for_series(symbol: str, exchange: str, interval: str):
+async def get_data_for_series(symbol: str, exchange: str, interval: str):
     """
     Get raw OHLCV data for a specific series.
     """
     try:
-        df = read_ohlcv_from_tsdb(symbol, exchange, interval)
+        df = await asyncio.to_thread(read_ohlcv_from_tsdb, symbol, exchange, interval)
         if df.empty:
             raise HTTPException(status_code=404, detail="No data found for the specified series.")
 
         # Convert DataFrame to list of dicts for JSON response
         df.reset_index(inplace=True)  # make 'ts' a column
-        df["ts"] = df["ts"].apply(lambda x: x.isoformat())  # format timestamp
+        df["ts"] = ist_iso_column(df["ts"])  # format timestamp
 
-        # Round numeric columns for cleaner display
-        for col in ["open", "high", "low", "close", "volume", "oi"]:
-            if col in df.columns:
-                # Handle potential None values in 'oi'
-                df[col] = df[col].apply(lambda x: round(x, 2) if pd.notna(x) else None)
+        # Round numeric columns for cleaner display (missing 'oi' values stay NaN -> null)
+        numeric_cols = [c for c in ("open", "high", "low", "close", "volume", "oi") if c in df.columns]
+        df[numeric_cols] = df[numeric_cols].astype(np.float64).round(2)
+        # Volume is a share/contract count; whole-number series go out as JSON integers
+        if "volume" in df.columns:
+            volume = df["volume"].to_numpy()
+            if np.isfinite(volume).all() and (volume == np.trunc(volume)).all():
+                df["volume"] = volume.astype(np.int64)
 
-        return df.to_dict(orient="records")
+        return StreamingResponse(_iter_json_records(df), media_type="application/json")
 
     except Exception as exc:
         # Ensure exceptions are propagated correctly
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
-IST_TZ = "Asia/Kolkata"
-
+def _ensure_symbol_data(
+    sym: str,
+    exchange: str,
+    interval: str,
+    start_date: str,
+    end_date: str,
+) -> Optional[FetchEvent]:
+    """Fetch a single option leg if its stored coverage misses the requested window."""
+    requested_start = to_ist_timestamp(start_date)
+    requested_end = to_ist_timestamp(end_date)
+
+    coverage = cached_coverage(sym, exchange, interval)
+    if coverage and coverage.get("first_ts") and coverage.get("last_ts"):
+        coverage_start = coverage["first_ts"].astimezone(IST_TZ)
+        coverage_end = coverage["last_ts"].astimezone(IST_TZ)
+        if coverage_start <= requested_start and coverage_end >= requested_end:
+            return None
 
-def _to_ist_timestamp(value: str) -> pd.Timestamp:
-    ts = pd.to_datetime(value)
-    if ts.tzinfo is None:
-        ts = ts.tz_localize(IST_TZ)
-    else:
-        ts = ts.tz_convert(IST_TZ)
-    return ts
+    try:
+        rows = fetch_history_to_tsdb(
+            symbol=sym,
+            exchange=exchange,
+            interval=interval,
+            start_date=start_date,
+            end_date=end_date,
+            expand_option_pair=False,
+        )
+    except RuntimeError as exc:  # propagate as HTTP error later
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    if rows <= 0:
+        return None
+    invalidate_coverage(sym, exchange, interval)
+    return FetchEvent(
+        symbol=sym,
+        start_date=start_date,
+        end_date=end_date,
+        rows_upserted=rows,
+        reason="auto_fetch_missing_option",
+    )
 
 
-def ensure_option_data(cfg: Dict[str, Any]) -> List[FetchEvent]:
+async def ensure_option_data(cfg: Dict[str, Any]) -> List[FetchEvent]:
     symbol = cfg.get("symbol")
     exchange = cfg.get("exchange")
     interval = cfg.get("interval")
@@ -299,50 +389,28 @@ def ensure_option_data(cfg: Dict[str, Any]) -> List[FetchEvent]:
     else:
         desired_symbols = [pe_symbol, ce_symbol]
 
-    requested_start = _to_ist_timestamp(start_date)
-    requested_end = _to_ist_timestamp(end_date)
-
-    fetch_events: List[FetchEvent] = []
-
-    for sym in desired_symbols:
-        coverage = get_series_coverage(sym, exchange, interval)
-        needs_fetch = True
-
-        if coverage and coverage.get("first_ts") and coverage.get("last_ts"):
-            coverage_start = coverage["first_ts"].tz_convert(IST_TZ)
-            coverage_end = coverage["last_ts"].tz_convert(IST_TZ)
-            if coverage_start <= requested_start and coverage_end >= requested_end:
-                needs_fetch = False
-
-        if needs_fetch:
-            try:
-                rows = fetch_history_to_tsdb(
-                    symbol=sym,
-                    exchange=exchange,
-                    interval=interval,
-                    start_date=start_date,
-                    end_date=end_date,
-                )
-            except RuntimeError as exc:  # propagate as HTTP error later
-                raise HTTPException(status_code=500, detail=str(exc)) from exc
-            if rows > 0:
-                fetch_events.append(
-                    FetchEvent(
-                        symbol=sym,
-                        start_date=start_date,
-                        end_date=end_date,
-                        rows_upserted=rows,
-                        reason="auto_fetch_missing_option",
-                    )
-                )
-
-    return fetch_events
+    # Legs are independent DB/network round-trips; fetch them concurrently only
+    # when OPENALGO_FETCH_WORKERS allows more than one OpenAlgo request in flight
+    if FETCH_WORKERS > 1:
+        results = await asyncio.gather(
+            *(
+                asyncio.to_thread(_ensure_symbol_data, sym, exchange, interval, start_date, end_date)
+                for sym in desired_symbols
+            )
+        )
+    else:
+        results = [
+            await asyncio.to_thread(_ensure_symbol_data, sym, exchange, interval, start_date, end_date)
+            for sym in desired_symbols
+        ]
+    return [event for event in results if event is not None]
 
 
 @app.post("/fetch", response_model=FetchResponse)
-def fetch_history(payload: FetchRequest):
+async def fetch_history(payload: FetchRequest):
     try:
-        rows = fetch_history_to_tsdb(
+        rows = await asyncio.to_thread(
+            fetch_history_to_tsdb,
             payload.symbol,
             payload.exchange,
             payload.interval,
@@ -354,16 +422,18 @@ def fetch_history(payload: FetchRequest):
         raise HTTPException(status_code=422, detail=str(exc)) from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    if rows > 0:
+        invalidate_coverage(payload.symbol, payload.exchange, payload.interval)
     return FetchResponse(rows_upserted=rows)
 
 
 @app.post("/backtest", response_model=BacktestResponse)
-def run_backtest_api(payload: BacktestRequest):
-    cfg = payload.dict(by_alias=True, exclude_none=True)
-    strategy_name = cfg.pop("strategy_name")
-    strategy_params = cfg.pop("strategy_params", {})
-    write_csv = cfg.pop("write_csv", False)
-    last_n = cfg.pop("last_n_trades", 10)
+async def run_backtest_api(payload: BacktestRequest):
+    cfg = payload.model_dump(by_alias=True, exclude_none=True, exclude=BACKTEST_CONTROL_FIELDS)
+    strategy_name = payload.strategy_name
+    strategy_params = payload.strategy_params
+    write_csv = payload.write_csv
+    last_n = payload.last_n_trades
 
     if strategy_name not in STRATEGIES:
         raise HTTPException(status_code=404, detail=f"Strategy '{strategy_name}' not found.")
@@ -371,39 +441,35 @@ def run_backtest_api(payload: BacktestRequest):
     # Merge base config with strategy-specific params
     run_config = {**cfg, **strategy_params}
 
-    fetch_events = ensure_option_data(cfg)
+    fetch_events = await ensure_option_data(cfg)
 
-    strategy_runner = STRATEGIES[strategy_name]["run"]
-    result = strategy_runner(run_config, write_csv=write_csv)
+    strategy_runner = _get_strategy_runner(strategy_name)
+    result = await asyncio.to_thread(strategy_runner, run_config, write_csv=write_csv)
 
     summary = result.get("summary")
     if summary is None:
         message = result.get("message", "Backtest could not be completed.")
         raise HTTPException(status_code=404, detail=message)
 
-    trades_all = _serialize_trades(result["trades"])
-    trades_tail = trades_all[-last_n:] if last_n else trades_all
-
-    daily_stats_raw = result.get("daily_stats", [])
-    daily_stats: List[Dict[str, Any]] = []
-    for item in daily_stats_raw:
-        normalized: Dict[str, Any] = {}
-        for key, value in item.items():
-            if value is None:
-                normalized[key] = None
-            elif isinstance(value, numbers.Integral):
-                normalized[key] = int(value)
-            elif isinstance(value, numbers.Number):
-                normalized[key] = float(value)
-            else:
-                normalized[key] = value
-        daily_stats.append(normalized)
-
-    return BacktestResponse(
-        summary=summary,
-        trades_tail=trades_tail,
-        trades_all=trades_all,
-        daily_stats=daily_stats,
-        output_csv=result.get("output_csv"),
-        fetch_events=fetch_events,
+    if payload.include_all_trades:
+        trades_all = serialize_trades(result["trades"])
+        trades_tail = trades_all[-last_n:] if last_n else trades_all
+    else:
+        # Only the tail is rendered, so don't serialize the rest
+        trades_all = []
+        trades_tail = serialize_trades(result["trades"], limit=last_n)
+
+    daily_stats = frame_to_records(pd.DataFrame(result.get("daily_stats", [])))
+
+    # Large trade lists: hand the dict straight to orjson instead of re-validating
+    # it through BacktestResponse and jsonable_encoder.
+    return ORJSONResponse(
+        {
+            "summary": summary,
+            "trades_tail": trades_tail,
+            "trades_all": trades_all,
+            "daily_stats": daily_stats,
+            **output_fields(result.get("output_path")),
+            "fetch_events": [event.model_dump() for event in fetch_events],
+        }
     )
@@ -0,0 +1,21 @@
+"""
+Process-pool entry point for single backtests.
+
+Lives outside master.main so pool workers can import it without building the
+FastAPI app or rediscovering strategies.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any, Dict
+
+# The parts of a strategy result /api/single/backtest reads. The OHLCV frames
+# under "data" stay in the worker instead of being pickled back and dropped.
+RESULT_KEYS = ("summary", "trades", "daily_stats", "output_path", "message")
+
+
+def run_backtest(module_name: str, config: Dict[str, Any], write_csv: bool = False) -> Dict[str, Any]:
+    """Run a strategy module's `run` and return only the fields the API responds with."""
+    result = importlib.import_module(module_name).run(config, write_csv=write_csv)
+    return {key: result[key] for key in RESULT_KEYS if key in result}
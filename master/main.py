@@ -5,41 +5,62 @@ with the permutation tester workflow into a single surface.
 
 from __future__ import annotations
 
+import asyncio
 import csv
+import functools
 import importlib
 import io
+import json
 import logging
-import numbers
+import multiprocessing
 import pkgutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import pandas as pd
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException
 from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
+from build_strategy_manifest import stale_manifest_reason
+from master.backtest_worker import run_backtest
 from symbol_utils import get_option_pair, is_option_symbol
 from tester_app.core.database import (
     clear_results_table,
     db_stats,
     ensure_results_table,
+    flush_pending_results,
+    flush_results,
     insert_result,
 )
-from tester_app.core.runner import PermutationRunner
+from tester_app.core.runner import PermutationRunner, cpu_budget, default_max_workers
 from tester_app.strategies import get_registry
 from tester_app.core.runner import JobGenerator  # noqa: F401  # re-export
 from tsdb_pipeline import (
     delete_series,
     fetch_history_to_tsdb,
-    get_series_coverage,
     list_available_series,
     read_ohlcv_from_tsdb,
 )
+from trade_io import output_fields
+from web_common import (
+    IST_TZ,
+    ORJSONResponse,
+    cached_coverage,
+    frame_to_records,
+    invalidate_coverage,
+    ist_iso_column,
+    render_page,
+    serialize_trades,
+    to_ist_timestamp,
+)
 
 logger = logging.getLogger("master")
 
@@ -55,11 +76,49 @@ else:
 # --- Single-run strategy loader ------------------------------------------------
 
 STRATEGIES: Dict[str, Dict[str, Any]] = {}
+STRATEGY_MANIFEST_PATH = Path(__file__).resolve().parent.parent / "app" / "strategies" / "_manifest.json"
+
+
+def _load_strategy_manifest() -> Optional[List[Dict[str, Any]]]:
+    """Read the build-time manifest written by build_strategy_manifest.py, if present."""
+    if not STRATEGY_MANIFEST_PATH.exists():
+        return None
+    try:
+        manifest = json.loads(STRATEGY_MANIFEST_PATH.read_text(encoding="utf-8"))
+        entries = manifest["strategies"]
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning("Ignoring unreadable strategy manifest %s: %s", STRATEGY_MANIFEST_PATH, exc)
+        return None
+    stale = stale_manifest_reason(manifest)
+    if stale:
+        logger.warning("Strategy manifest %s is stale (%s); scanning strategies instead", STRATEGY_MANIFEST_PATH, stale)
+        return None
+    return entries
 
 
 def load_single_strategies() -> None:
-    """Discover strategies from the legacy single-run app."""
+    """
+    Register strategies from the legacy single-run app.
+
+    With a manifest only the metadata is registered and each module is
+    imported on first use (see `_get_strategy_module`); otherwise every
+    module is discovered and imported eagerly.
+    """
     STRATEGIES.clear()
+    manifest = _load_strategy_manifest()
+    if manifest is None:
+        _discover_single_strategies()
+        return
+
+    for entry in manifest:
+        info = entry["info"]
+        strategy_name = info.get("name")
+        if strategy_name:
+            STRATEGIES[strategy_name] = {"info": info, "module": entry["module"]}
+            logger.info("Registered single strategy: %s", info.get("title", strategy_name))
+
+
+def _discover_single_strategies() -> None:
     root_dir = Path(__file__).resolve().parent.parent
     strategies_path = root_dir / "app" / "strategies"
 
@@ -76,70 +135,55 @@ def load_single_strategies() -> None:
                 info = module.get_info()
                 strategy_name = info.get("name")
                 if strategy_name:
-                    STRATEGIES[strategy_name] = {
-                        "info": info,
-                        "run": module.run,
-                    }
+                    STRATEGIES[strategy_name] = {"info": info, "module": module.__name__}
                     logger.info("Loaded single strategy: %s", info.get("title", strategy_name))
         except Exception as exc:  # noqa: BLE001
             logger.exception("Failed to load strategy from %s: %s", name, exc)
 
 
-# --- Shared helpers -----------------------------------------------------------
-
-TRADE_COLUMNS = [
-    "entry_time",
-    "exit_time",
-    "symbol",
-    "side",
-    "entry",
-    "exit",
-    "gross_rupees",
-    "costs_rupees",
-    "pnl_rupees",
-    "exit_reason",
-]
+def _get_strategy_module(strategy_name: str) -> Any:
+    """Return the strategy's module, importing it on first use."""
+    return importlib.import_module(STRATEGIES[strategy_name]["module"])
 
 
-def _to_ist_iso(value: Any) -> Optional[str]:
-    if value in (None, ""):
-        return None
-    if not isinstance(value, pd.Timestamp):
+def _warm_strategies() -> None:
+    """Compile strategy kernels ahead of the first backtest (also fills the numba disk cache the workers load from)."""
+    for strategy_name in list(STRATEGIES):
+        started = time.perf_counter()
         try:
-            value = pd.to_datetime(value)
-        except (TypeError, ValueError):  # noqa: PERF203
-            return None
-    if value.tzinfo is None:
-        value = value.tz_localize("UTC")
-    return value.tz_convert("Asia/Kolkata").isoformat()
-
+            warm_up = getattr(_get_strategy_module(strategy_name), "warm_up", None)
+            if warm_up is None:
+                continue
+            warm_up()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Warm-up failed for strategy %s: %s", strategy_name, exc)
+            continue
+        logger.info("Warmed strategy %s in %.2fs", strategy_name, time.perf_counter() - started)
+
+
+# Single backtests and the permutation runner share one CPU budget: single runs
+# take a quarter of it by default and the runner defaults to the rest.
+SINGLE_BACKTEST_WORKERS = max(1, int(os.getenv("SINGLE_BACKTEST_WORKERS", str(max(1, cpu_budget() // 4)))))
+_BACKTEST_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _get_backtest_pool() -> ProcessPoolExecutor:
+    global _BACKTEST_POOL
+    if _BACKTEST_POOL is None:
+        # Workers start from a forkserver rather than forking this process, which
+        # may be mid-import or mid-compile on the strategy warm-up thread; the
+        # server preloads the worker entry point and the strategy modules once.
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload(
+                ["master.backtest_worker"] + [entry["module"] for entry in STRATEGIES.values()]
+            )
+        _BACKTEST_POOL = ProcessPoolExecutor(max_workers=SINGLE_BACKTEST_WORKERS, mp_context=context)
+    return _BACKTEST_POOL
 
-def _serialize_trades(trades: pd.DataFrame, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-    if trades.empty:
-        return []
 
-    available_cols = [c for c in TRADE_COLUMNS if c in trades.columns]
-    frame = trades[available_cols].copy()
-    if limit:
-        frame = frame.tail(limit)
-
-    records = frame.to_dict(orient="records")
-    for record in records:
-        for time_field in ("entry_time", "exit_time"):
-            record[time_field] = _to_ist_iso(record.get(time_field))
-        for key, value in list(record.items()):
-            if value is None or value == "":
-                record[key] = None
-                continue
-            if isinstance(value, numbers.Integral):
-                record[key] = int(value)
-            elif isinstance(value, numbers.Number):
-                record[key] = float(value)
-            elif pd.isna(value):
-                record[key] = None
-            else:
-                record[key] = value
-    return records
+# --- Shared helpers -----------------------------------------------------------
 
 
 # --- Pydantic models (single-run) ---------------------------------------------
@@ -194,7 +238,7 @@ class BacktestRequest(BaseModel):
     )
     write_csv: bool = Field(
         default=False,
-        description="Persist trades CSV alongside JSON summary",
+        description="Persist trades (CSV, or Parquet with TRADES_OUTPUT_FORMAT=parquet) alongside JSON summary",
     )
     last_n_trades: int = Field(default=10, ge=1, le=200, description="Trades to include in response")
     strategy_params: Dict[str, Any] = Field(
@@ -202,8 +246,11 @@ class BacktestRequest(BaseModel):
         description="Dynamic parameters for the selected strategy",
     )
 
-    class Config:
-        allow_population_by_field_name = True
+    model_config = ConfigDict(populate_by_name=True)
+
+
+# Request fields that steer the endpoint rather than feed the strategy config
+BACKTEST_CONTROL_FIELDS = frozenset({"strategy_name", "strategy_params", "write_csv", "last_n_trades"})
 
 
 class BacktestResponse(BaseModel):
@@ -211,6 +258,8 @@ class BacktestResponse(BaseModel):
     trades_tail: List[Dict[str, Any]]
     trades_all: List[Dict[str, Any]]
     daily_stats: List[Dict[str, Any]]
+    output_path: Optional[str] = None
+    output_format: Optional[str] = None
     output_csv: Optional[str] = None
     fetch_events: List[FetchEvent] = Field(default_factory=list)
 
@@ -257,10 +306,16 @@ class HistoryItem(BaseModel):
 
 # --- FastAPI application ------------------------------------------------------
 
-app = FastAPI(title="Timescale Gravity Master", version="1.0.0")
+
+app = FastAPI(
+    title="Timescale Gravity Master",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 BASE_DIR = Path(__file__).resolve().parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+TEMPLATES_DIR = BASE_DIR / "templates"
+templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
 
 # --- Permutation state --------------------------------------------------------
@@ -324,7 +379,7 @@ def get_or_create_runner(strategy_name: Optional[str] = None) -> PermutationRunn
                 "NIFTY28OCT2525200PE",
             ],
         }
-        max_workers = 2
+        max_workers = default_max_workers(reserved=SINGLE_BACKTEST_WORKERS)
         current_runner = PermutationRunner(
             strategy_name=current_strategy,
             base_config=current_base_config,
@@ -336,18 +391,14 @@ def get_or_create_runner(strategy_name: Optional[str] = None) -> PermutationRunn
     return current_runner
 
 
-# --- Single-run utilities -----------------------------------------------------
-
-IST_TZ = "Asia/Kolkata"
+def _control_status(runner: PermutationRunner) -> Dict[str, Any]:
+    """Runner status plus database stats (db_stats is cached briefly, so this is one query at most)."""
+    status = runner.status()
+    status["database"] = db_stats()
+    return status
 
 
-def _to_ist_timestamp(value: str) -> pd.Timestamp:
-    ts = pd.to_datetime(value)
-    if ts.tzinfo is None:
-        ts = ts.tz_localize(IST_TZ)
-    else:
-        ts = ts.tz_convert(IST_TZ)
-    return ts
+# --- Single-run utilities -----------------------------------------------------
 
 
 def ensure_option_data(cfg: Dict[str, Any]) -> List[FetchEvent]:
@@ -372,18 +423,18 @@ def ensure_option_data(cfg: Dict[str, Any]) -> List[FetchEvent]:
     else:
         desired_symbols = [pe_symbol, ce_symbol]
 
-    requested_start = _to_ist_timestamp(start_date)
-    requested_end = _to_ist_timestamp(end_date)
+    requested_start = to_ist_timestamp(start_date)
+    requested_end = to_ist_timestamp(end_date)
 
     fetch_events: List[FetchEvent] = []
 
     for sym in desired_symbols:
-        coverage = get_series_coverage(sym, exchange, interval)
+        coverage = cached_coverage(sym, exchange, interval)
         needs_fetch = True
 
         if coverage and coverage.get("first_ts") and coverage.get("last_ts"):
-            coverage_start = coverage["first_ts"].tz_convert(IST_TZ)
-            coverage_end = coverage["last_ts"].tz_convert(IST_TZ)
+            coverage_start = coverage["first_ts"].astimezone(IST_TZ)
+            coverage_end = coverage["last_ts"].astimezone(IST_TZ)
             if coverage_start <= requested_start and coverage_end >= requested_end:
                 needs_fetch = False
 
@@ -399,6 +450,8 @@ def ensure_option_data(cfg: Dict[str, Any]) -> List[FetchEvent]:
             except RuntimeError as exc:  # noqa: PERF203
                 raise HTTPException(status_code=500, detail=str(exc)) from exc
             if rows > 0:
+                # The fetch also upserts the opposite leg, so drop both cached entries
+                invalidate_coverage(sym, exchange, interval)
                 fetch_events.append(
                     FetchEvent(
                         symbol=sym,
@@ -419,6 +472,7 @@ def ensure_option_data(cfg: Dict[str, Any]) -> List[FetchEvent]:
 def on_startup() -> None:
     logging.basicConfig(level=logging.INFO)
     load_single_strategies()
+    threading.Thread(target=_warm_strategies, name="strategy-warmup", daemon=True).start()
     ensure_results_table()
     get_or_create_runner()
     logger.info("Master app startup complete")
@@ -426,16 +480,20 @@ def on_startup() -> None:
 
 @app.on_event("shutdown")
 def on_shutdown() -> None:
-    global current_runner
+    global current_runner, _BACKTEST_POOL
     if current_runner:
         current_runner.reset()
         current_runner = None
+    if _BACKTEST_POOL is not None:
+        _BACKTEST_POOL.shutdown(wait=False, cancel_futures=True)
+        _BACKTEST_POOL = None
+    flush_results()
     logger.info("Master app shutdown complete")
 
 
 @app.get("/", response_class=HTMLResponse)
-def index(request: Request) -> HTMLResponse:
-    return templates.TemplateResponse("index.html", {"request": request})
+def index() -> HTMLResponse:
+    return render_page(templates, TEMPLATES_DIR, "index.html")
 
 
 # --- Routes: single backtest namespace ---------------------------------------
@@ -459,6 +517,7 @@ def single_inventory(sort_order: str = "asc") -> List[InventoryItem]:
 def single_inventory_delete(symbol: str, exchange: str, interval: str) -> Dict[str, Any]:
     try:
         rows_deleted = delete_series(symbol, exchange, interval)
+        invalidate_coverage(symbol, exchange, interval)
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     return {
@@ -478,11 +537,10 @@ def single_series_data(symbol: str, exchange: str, interval: str) -> List[Dict[s
         raise HTTPException(status_code=404, detail="No data found for the specified series.")
 
     df.reset_index(inplace=True)
-    df["ts"] = df["ts"].apply(lambda x: x.isoformat())
-    for col in ["open", "high", "low", "close", "volume", "oi"]:
-        if col in df.columns:
-            df[col] = df[col].apply(lambda x: round(x, 2) if pd.notna(x) else None)
-    return df.to_dict(orient="records")
+    df["ts"] = ist_iso_column(df["ts"])
+    numeric_cols = [c for c in ("open", "high", "low", "close", "volume", "oi") if c in df.columns]
+    df[numeric_cols] = df[numeric_cols].round(2)
+    return frame_to_records(df)
 
 
 @app.post("/api/single/fetch", response_model=FetchResponse)
@@ -500,56 +558,52 @@ def single_fetch(payload: FetchRequest) -> FetchResponse:
         raise HTTPException(status_code=422, detail=str(exc)) from exc
     except RuntimeError as exc:  # noqa: PERF203
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    invalidate_coverage(payload.symbol, payload.exchange, payload.interval)
     return FetchResponse(rows_upserted=rows)
 
 
 @app.post("/api/single/backtest", response_model=BacktestResponse)
-def single_backtest(payload: BacktestRequest) -> BacktestResponse:
-    cfg = payload.dict(by_alias=True, exclude_none=True)
-    strategy_name = cfg.pop("strategy_name")
-    strategy_params = cfg.pop("strategy_params", {})
-    write_csv = cfg.pop("write_csv", False)
-    last_n = cfg.pop("last_n_trades", 10)
+async def single_backtest(payload: BacktestRequest) -> ORJSONResponse:
+    cfg = payload.model_dump(by_alias=True, exclude_none=True, exclude=BACKTEST_CONTROL_FIELDS)
+    strategy_name = payload.strategy_name
+    strategy_params = payload.strategy_params
+    write_csv = payload.write_csv
+    last_n = payload.last_n_trades
 
     if strategy_name not in STRATEGIES:
         raise HTTPException(status_code=404, detail=f"Strategy '{strategy_name}' not found.")
 
     run_config = {**cfg, **strategy_params}
-    fetch_events = ensure_option_data(cfg)
+    fetch_events = await asyncio.to_thread(ensure_option_data, cfg)
 
-    strategy_runner = STRATEGIES[strategy_name]["run"]
-    result = strategy_runner(run_config, write_csv=write_csv)
+    # Strategy runs are CPU-bound; a process pool keeps them off the event loop and the GIL
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(
+        _get_backtest_pool(),
+        functools.partial(run_backtest, STRATEGIES[strategy_name]["module"], run_config, write_csv=write_csv),
+    )
 
     summary = result.get("summary")
     if summary is None:
         message = result.get("message", "Backtest could not be completed.")
         raise HTTPException(status_code=404, detail=message)
 
-    trades_all = _serialize_trades(result["trades"])
+    trades_all = serialize_trades(result["trades"])
     trades_tail = trades_all[-last_n:] if last_n else trades_all
 
-    daily_stats_raw = result.get("daily_stats", [])
-    daily_stats: List[Dict[str, Any]] = []
-    for item in daily_stats_raw:
-        normalized: Dict[str, Any] = {}
-        for key, value in item.items():
-            if value is None:
-                normalized[key] = None
-            elif isinstance(value, numbers.Integral):
-                normalized[key] = int(value)
-            elif isinstance(value, numbers.Number):
-                normalized[key] = float(value)
-            else:
-                normalized[key] = value
-        daily_stats.append(normalized)
-
-    return BacktestResponse(
-        summary=summary,
-        trades_tail=trades_tail,
-        trades_all=trades_all,
-        daily_stats=daily_stats,
-        output_csv=result.get("output_csv"),
-        fetch_events=fetch_events,
+    daily_stats = frame_to_records(pd.DataFrame(result.get("daily_stats", [])))
+
+    # Large trade lists: hand the dict straight to orjson instead of re-validating
+    # it through BacktestResponse and jsonable_encoder.
+    return ORJSONResponse(
+        {
+            "summary": summary,
+            "trades_tail": trades_tail,
+            "trades_all": trades_all,
+            "daily_stats": daily_stats,
+            **output_fields(result.get("output_path")),
+            "fetch_events": [event.model_dump() for event in fetch_events],
+        }
     )
 
 
@@ -564,8 +618,7 @@ def multi_strategies() -> Dict[str, Any]:
 @app.get("/api/multi/status")
 def multi_status() -> Dict[str, Any]:
     runner = get_or_create_runner()
-    status = runner.status()
-    status["database"] = db_stats()
+    status = _control_status(runner)
     status["test_name"] = current_test_name
     return status
 
@@ -574,27 +627,21 @@ def multi_status() -> Dict[str, Any]:
 def multi_start() -> ControlResponse:
     runner = get_or_create_runner()
     runner.start()
-    status = runner.status()
-    status["database"] = db_stats()
-    return ControlResponse(status=status)
+    return ControlResponse(status=_control_status(runner))
 
 
 @app.post("/api/multi/pause", response_model=ControlResponse)
 def multi_pause() -> ControlResponse:
     runner = get_or_create_runner()
     runner.pause()
-    status = runner.status()
-    status["database"] = db_stats()
-    return ControlResponse(status=status)
+    return ControlResponse(status=_control_status(runner))
 
 
 @app.post("/api/multi/reset", response_model=ControlResponse)
 def multi_reset() -> ControlResponse:
     runner = get_or_create_runner()
     runner.reset()
-    status = runner.status()
-    status["database"] = db_stats()
-    return ControlResponse(status=status)
+    return ControlResponse(status=_control_status(runner))
 
 
 @app.post("/api/multi/configure", response_model=ControlResponse)
@@ -649,8 +696,7 @@ def multi_configure(config: ConfigRequest) -> ControlResponse:
                 test_name=config.test_name,
             )
 
-        status = current_runner.status()
-        status["database"] = db_stats()
+        status = _control_status(current_runner)
         status["test_name"] = current_test_name
         return ControlResponse(status=status)
 
@@ -665,8 +711,7 @@ def multi_configure(config: ConfigRequest) -> ControlResponse:
 def multi_clear_results() -> ControlResponse:
     clear_results_table()
     runner = get_or_create_runner()
-    status = runner.status()
-    status["database"] = db_stats()
+    status = _control_status(runner)
     status["test_name"] = current_test_name
     return ControlResponse(status=status)
 
@@ -675,13 +720,13 @@ def multi_clear_results() -> ControlResponse:
 def multi_history_batches() -> List[Dict[str, Any]]:
     """Get list of batches grouped by test_name with start/end times."""
     try:
-        from tester_app.export_results import fetch_results
+        from tester_app.export_results import iter_results
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=f"History module unavailable: {exc}") from exc
 
-    rows = fetch_results()
-    if not rows:
-        return []
+    flush_pending_results()
+
+    rows = iter_results()
 
     # Group by test_name (or create unique batch identifier)
     batches_dict: Dict[str, Dict[str, Any]] = {}
@@ -716,11 +761,13 @@ def multi_history_batches() -> List[Dict[str, Any]]:
 def multi_history_batch_details(batch_id: str) -> List[HistoryItem]:
     """Get detailed rows for a specific batch."""
     try:
-        from tester_app.export_results import fetch_results
+        from tester_app.export_results import iter_results
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=f"History module unavailable: {exc}") from exc
 
-    rows = fetch_results()
+    flush_pending_results()
+
+    rows = iter_results()
 
     # Filter rows that match this batch
     # Decode batch_id to get test_name, strategy, date
@@ -757,73 +804,83 @@ def multi_history_batch_details(batch_id: str) -> List[HistoryItem]:
 
 
 @app.get("/api/multi/history", response_model=List[HistoryItem])
-def multi_history() -> List[HistoryItem]:
+def multi_history() -> ORJSONResponse:
     try:
-        from tester_app.export_results import fetch_results
+        from tester_app.export_results import iter_results
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=f"History module unavailable: {exc}") from exc
 
-    rows = fetch_results()
-    history: List[HistoryItem] = []
-    for row in rows:
-        params = row.get("params") or {}
-        summary = row.get("summary") or {}
-        history.append(
-            HistoryItem(
-                id=str(row.get("id")),
-                created_at=row.get("created_at"),
-                strategy=row.get("strategy"),
-                symbol=row.get("symbol"),
-                exchange=row.get("exchange"),
-                interval=row.get("interval"),
-                test_name=row.get("test_name"),
-                params=params,
-                summary=summary,
-            )
-        )
-    return history
+    flush_pending_results()
+
+    rows = iter_results()
+    # Rows already have the HistoryItem shape; skip per-row model validation
+    history = [
+        {
+            "id": str(row.get("id")),
+            "created_at": row.get("created_at"),
+            "strategy": row.get("strategy"),
+            "symbol": row.get("symbol"),
+            "exchange": row.get("exchange"),
+            "interval": row.get("interval"),
+            "test_name": row.get("test_name"),
+            "params": row.get("params") or {},
+            "summary": row.get("summary") or {},
+        }
+        for row in rows
+    ]
+    return ORJSONResponse(history)
+
+
+EXPORT_CHUNK_ROWS = 500
 
 
 @app.get("/api/multi/history/export")
 def multi_history_export(ids: Optional[str] = None, batch_id: Optional[str] = None) -> StreamingResponse:
     try:
-        from tester_app.export_results import fetch_results, flatten_row
+        from tester_app.export_results import (
+            build_flatten_plan,
+            export_field_order,
+            flatten_values,
+            iter_result_rows,
+            iter_results,
+        )
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=f"Export module unavailable: {exc}") from exc
 
+    flush_pending_results()
+
     id_list: Optional[List[str]] = None
 
     # If batch_id is provided, get all IDs for that batch
     if batch_id:
-        all_rows = fetch_results()
         id_list = []
-        for row in all_rows:
+        for row in iter_results():
             row_test_name = row.get("test_name") or "Unnamed Batch"
             row_batch_key = f"{row_test_name}_{row.get('strategy')}_{row.get('created_at').date()}"
             if row_batch_key == batch_id:
                 id_list.append(str(row.get("id")))
+        if not id_list:
+            raise HTTPException(status_code=404, detail=f"Batch '{batch_id}' not found")
     elif ids:
         id_list = [candidate.strip() for candidate in ids.split(",") if candidate.strip()]
 
-    rows = fetch_results(ids=id_list)
-    if not rows:
+    # The header comes from the JSONB keys in SQL, so rows can be streamed afterwards
+    field_order = export_field_order(ids=id_list)
+    if not field_order:
         raise HTTPException(status_code=404, detail="No tester results available for export.")
-
-    flattened: List[Dict[str, Any]] = [flatten_row(row) for row in rows]
-    if not flattened:
-        raise HTTPException(status_code=404, detail="No tester results available for export.")
-
-    field_order: List[str] = list(flattened[0].keys())
-    for entry in flattened[1:]:
-        for key in entry.keys():
-            if key not in field_order:
-                field_order.append(key)
-
-    buffer = io.StringIO()
-    writer = csv.DictWriter(buffer, fieldnames=field_order, extrasaction="ignore")
-    writer.writeheader()
-    writer.writerows(flattened)
-    buffer.seek(0)
+    plan = build_flatten_plan(field_order)
+
+    def generate_csv() -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(field_order)
+        for count, row in enumerate(iter_result_rows(ids=id_list), start=1):
+            writer.writerow(flatten_values(row, plan))
+            if count % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
 
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     if batch_id:
@@ -834,19 +891,19 @@ def multi_history_export(ids: Optional[str] = None, batch_id: Optional[str] = No
         suffix = "all"
     filename = f"tester_results_{suffix}_{timestamp}.csv"
     headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
-    return StreamingResponse(iter([buffer.getvalue()]), media_type="text/csv", headers=headers)
+    return StreamingResponse(generate_csv(), media_type="text/csv", headers=headers)
 
 
 @app.delete("/api/multi/history/batch/{batch_id}")
 def multi_history_delete_batch(batch_id: str) -> Dict[str, Any]:
     """Delete all rows belonging to a specific batch."""
     try:
-        from tester_app.export_results import fetch_results
-        from tsdb_pipeline import get_conn
+        from tester_app.export_results import iter_results
+        from tsdb_pipeline import pooled_conn
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=f"Database module unavailable: {exc}") from exc
 
-    rows = fetch_results()
+    rows = iter_results()
 
     # Find all IDs for this batch
     ids_to_delete: List[str] = []
@@ -861,7 +918,7 @@ def multi_history_delete_batch(batch_id: str) -> Dict[str, Any]:
 
     # Delete from database (cast text array to uuid array)
     delete_sql = "DELETE FROM tester_results WHERE id = ANY(%s::uuid[])"
-    with get_conn() as conn, conn.cursor() as cur:
+    with pooled_conn() as conn, conn.cursor() as cur:
         cur.execute(delete_sql, (ids_to_delete,))
         deleted_count = cur.rowcount
         conn.commit()
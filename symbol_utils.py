@@ -5,39 +5,42 @@ Symbol utility functions for handling option symbols (PE/CE pairs)
 """
 
 import re
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
 
+# Pattern: <BASE><STRIKE><PE|CE>
+# Strike is typically 4-6 digits before PE/CE
+_OPTION_RE = re.compile(r'^(.+?)(\d{4,6})(PE|CE)$', re.IGNORECASE)
 
-def parse_option_symbol(symbol: str) -> Optional[dict]:
+
+class OptionParts(NamedTuple):
+    base: str
+    strike: str
+    option_type: str
+    full_symbol: str
+
+
+@lru_cache(maxsize=4096)
+def parse_option_symbol(symbol: str) -> Optional[OptionParts]:
     """
     Parse an option symbol to extract components.
 
-    Example: NIFTY14OCT2525000PE -> {
-        'base': 'NIFTY14OCT25',
-        'strike': '25000',
-        'option_type': 'PE'
-    }
+    Example: NIFTY14OCT2525000PE -> OptionParts(
+        base='NIFTY14OCT25',
+        strike='25000',
+        option_type='PE',
+        full_symbol='NIFTY14OCT2525000PE'
+    )
 
     Returns None if the symbol doesn't match the expected pattern.
     """
-    # Pattern: <BASE><STRIKE><PE|CE>
-    # Strike is typically 4-6 digits before PE/CE
-    pattern = r'^(.+?)(\d{4,6})(PE|CE)$'
-    match = re.match(pattern, symbol, re.IGNORECASE)
+    match = _OPTION_RE.match(symbol)
 
     if not match:
         return None
 
-    base = match.group(1)
-    strike = match.group(2)
-    option_type = match.group(3).upper()
-
-    return {
-        'base': base,
-        'strike': strike,
-        'option_type': option_type,
-        'full_symbol': symbol
-    }
+    base, strike, option_type = match.groups()
+    return OptionParts(base, strike, option_type.upper(), symbol)
 
 
 def get_opposite_option(symbol: str) -> Optional[str]:
@@ -54,8 +57,8 @@ def get_opposite_option(symbol: str) -> Optional[str]:
     if not parsed:
         return None
 
-    opposite_type = 'CE' if parsed['option_type'] == 'PE' else 'PE'
-    return f"{parsed['base']}{parsed['strike']}{opposite_type}"
+    opposite_type = 'CE' if parsed.option_type == 'PE' else 'PE'
+    return f"{parsed.base}{parsed.strike}{opposite_type}"
 
 
 def get_option_pair(symbol: str) -> Tuple[Optional[str], Optional[str]]:
@@ -72,10 +75,15 @@ def get_option_pair(symbol: str) -> Tuple[Optional[str], Optional[str]]:
     if not parsed:
         return (None, None)
 
-    base_symbol = f"{parsed['base']}{parsed['strike']}"
+    base_symbol = f"{parsed.base}{parsed.strike}"
     return (f"{base_symbol}PE", f"{base_symbol}CE")
 
 
 def is_option_symbol(symbol: str) -> bool:
     """Check if a symbol is a valid option symbol (ends with PE or CE)"""
-    return parse_option_symbol(symbol) is not None
+    # Same as _OPTION_RE.match: at least one base char, 4+ strike digits, PE/CE suffix
+    return (
+        len(symbol) >= 7
+        and symbol[-2:].upper() in ('PE', 'CE')
+        and symbol[-6:-2].isdecimal()
+    )
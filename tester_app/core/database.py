@@ -4,11 +4,16 @@ Database operations for storing and retrieving backtest results.
 
 from __future__ import annotations
 
+import atexit
 import logging
-from typing import Any, Dict, Optional
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
 
-from psycopg2.extras import Json
-from tsdb_pipeline import get_conn
+import psycopg2
+from psycopg2.extras import Json, execute_batch, execute_values
+from tsdb_pipeline import pooled_conn
 
 logger = logging.getLogger(__name__)
 
@@ -25,15 +30,165 @@ CREATE TABLE IF NOT EXISTS tester_results (
     params JSONB NOT NULL,
     summary JSONB NOT NULL
 );
+CREATE INDEX IF NOT EXISTS tester_results_strategy_symbol_created_idx
+    ON tester_results (strategy, symbol, created_at DESC);
+CREATE INDEX IF NOT EXISTS tester_results_created_idx
+    ON tester_results (created_at DESC);
 """
 
+# lz4 TOAST compression (PG14+) packs the JSONB payloads smaller than the pglz
+# default and decompresses faster; only affects values written afterwards.
+RESULTS_COMPRESSION_SQL = """
+ALTER TABLE tester_results
+    ALTER COLUMN params SET COMPRESSION lz4,
+    ALTER COLUMN summary SET COMPRESSION lz4;
+"""
+
+INSERT_RESULTS_SQL = """
+INSERT INTO tester_results (strategy, symbol, exchange, interval, test_name, params, summary)
+VALUES %s;
+"""
+# Fixed row template matching the column list, rather than one inferred from the first row
+INSERT_RESULTS_TEMPLATE = "(%s, %s, %s, %s, %s, %s, %s)"
+
+# Results are buffered and written in batches; a timer flushes stragglers.
+INSERT_BATCH_SIZE = 500
+INSERT_FLUSH_INTERVAL_SECONDS = 1.0
+# Rows kept (buffered or being written) while writes fail; insert_result raises
+# beyond this instead of growing the buffer for as long as the database is down.
+INSERT_BUFFER_MAX_ROWS = 50_000
+
+# Timer flushes of slow runs carry only a few rows; those reuse a statement
+# prepared once per pooled connection instead of re-parsing the INSERT.
+PREPARED_INSERT_MAX_ROWS = 10
+PREPARE_INSERT_RESULT_SQL = """
+PREPARE insert_tester_result (text, text, text, text, text, jsonb, jsonb) AS
+INSERT INTO tester_results (strategy, symbol, exchange, interval, test_name, params, summary)
+VALUES ($1, $2, $3, $4, $5, $6, $7);
+"""
+EXECUTE_INSERT_RESULT_SQL = "EXECUTE insert_tester_result (%s, %s, %s, %s, %s, %s, %s);"
+_PREPARED_CONNS: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+_RESULT_BUFFER: List[Tuple[Any, ...]] = []
+_inflight_rows = 0
+_BUFFER_LOCK = threading.Lock()
+_FLUSH_LOCK = threading.Lock()
+_flush_timer: Optional[threading.Timer] = None
+
+_table_ready = False
+
+# Catalog sizes barely move between status polls; one query, cached briefly.
+DB_STATS_SQL = """
+SELECT
+    COUNT(*),
+    COALESCE(SUM(pg_column_size(summary)), 0),
+    pg_database_size(current_database()),
+    pg_size_pretty(pg_database_size(current_database())),
+    pg_total_relation_size('tester_results')
+FROM tester_results;
+"""
+DB_STATS_TTL_SECONDS = 1.0
+_STATS_CACHE: Dict[str, Any] = {"ts": 0.0, "value": None}
+_STATS_LOCK = threading.Lock()
+
 
 def ensure_results_table() -> None:
     """Ensure the results table exists."""
-    with get_conn() as conn, conn.cursor() as cur:
+    global _table_ready
+    with pooled_conn() as conn, conn.cursor() as cur:
         cur.execute(CREATE_RESULTS_TABLE_SQL)
         cur.execute("ALTER TABLE tester_results ADD COLUMN IF NOT EXISTS test_name TEXT;")
+        cur.execute("SAVEPOINT results_compression;")
+        try:
+            cur.execute(RESULTS_COMPRESSION_SQL)
+        except psycopg2.Error as exc:
+            # Servers built without lz4 keep the default compression
+            cur.execute("ROLLBACK TO SAVEPOINT results_compression;")
+            logger.warning("lz4 compression unavailable for tester_results: %s", exc)
         conn.commit()
+    _table_ready = True
+
+
+def _ensure_results_table_once() -> None:
+    # Apps call ensure_results_table() at startup; this only covers a failed/skipped startup
+    if not _table_ready:
+        ensure_results_table()
+
+
+def _insert_rows(conn: Any, rows: List[Tuple[Any, ...]]) -> None:
+    if len(rows) >= PREPARED_INSERT_MAX_ROWS:
+        with conn.cursor() as cur:
+            execute_values(cur, INSERT_RESULTS_SQL, rows, template=INSERT_RESULTS_TEMPLATE, page_size=INSERT_BATCH_SIZE)
+        return
+
+    if conn not in _PREPARED_CONNS:
+        with conn.cursor() as cur:
+            cur.execute(PREPARE_INSERT_RESULT_SQL)
+        # Commit so the statement is known to outlive this transaction
+        conn.commit()
+        _PREPARED_CONNS.add(conn)
+    with conn.cursor() as cur:
+        execute_batch(cur, EXECUTE_INSERT_RESULT_SQL, rows, page_size=PREPARED_INSERT_MAX_ROWS)
+
+
+def flush_results() -> int:
+    """Write buffered results to the database. Returns the number of rows written."""
+    global _flush_timer, _inflight_rows
+    with _FLUSH_LOCK:
+        with _BUFFER_LOCK:
+            rows = _RESULT_BUFFER[:]
+            _RESULT_BUFFER.clear()
+            _inflight_rows = len(rows)
+            if _flush_timer is not None:
+                _flush_timer.cancel()
+                _flush_timer = None
+        if not rows:
+            return 0
+
+        try:
+            _ensure_results_table_once()
+            with pooled_conn() as conn:
+                _insert_rows(conn, rows)
+        except Exception:
+            # Put the rows back ahead of anything queued meanwhile, so the retry
+            # timer (or the next flush) writes them in their original order
+            with _BUFFER_LOCK:
+                _RESULT_BUFFER[:0] = rows
+                _inflight_rows = 0
+                _schedule_flush_locked()
+            logger.error("Failed to store %d buffered results; kept for retry", len(rows))
+            raise
+        with _BUFFER_LOCK:
+            _inflight_rows = 0
+
+    logger.info("Stored %d results", len(rows))
+    return len(rows)
+
+
+def flush_pending_results() -> None:
+    """Flush before reading results back, so reads don't lag the flush timer."""
+    try:
+        flush_results()
+    except Exception:  # noqa: BLE001
+        # The rows stay queued for the retry timer; serve what is already stored
+        logger.warning("Reading tester results while buffered rows await a retry")
+
+
+def _schedule_flush_locked() -> None:
+    """Start the flush timer if none is pending. Caller holds _BUFFER_LOCK."""
+    global _flush_timer
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(INSERT_FLUSH_INTERVAL_SECONDS, _timed_flush)
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+
+def _timed_flush() -> None:
+    # No caller to raise to on the timer thread; the rows are already requeued
+    try:
+        flush_results()
+    except Exception:  # noqa: BLE001
+        logger.exception("Timed flush of tester results failed")
 
 
 def insert_result(
@@ -45,56 +200,69 @@ def insert_result(
     summary: Dict[str, Any],
     test_name: Optional[str] = None,
 ) -> None:
-    """Insert a backtest result into the database."""
-    ensure_results_table()
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            """
-            INSERT INTO tester_results (strategy, symbol, exchange, interval, test_name, params, summary)
-            VALUES (%(strategy)s, %(symbol)s, %(exchange)s, %(interval)s, %(test_name)s, %(params)s, %(summary)s);
-            """,
-            {
-                "strategy": strategy,
-                "symbol": symbol,
-                "exchange": exchange,
-                "interval": interval,
-                "test_name": test_name,
-                "params": Json(params),
-                "summary": Json(summary),
-            },
-        )
-        conn.commit()
-    logger.info(f"Stored result: {strategy} {symbol} {params}")
+    """Queue a backtest result for insertion; rows are written in batches."""
+    row = (strategy, symbol, exchange, interval, test_name, Json(params), Json(summary))
+    with _BUFFER_LOCK:
+        if len(_RESULT_BUFFER) + _inflight_rows >= INSERT_BUFFER_MAX_ROWS:
+            raise RuntimeError(
+                f"Result buffer full ({INSERT_BUFFER_MAX_ROWS} rows awaiting a database write); "
+                f"dropping {strategy} {symbol} result"
+            )
+        _RESULT_BUFFER.append(row)
+        pending = len(_RESULT_BUFFER)
+        if pending < INSERT_BATCH_SIZE:
+            _schedule_flush_locked()
+    logger.debug(f"Queued result: {strategy} {symbol} {params}")
+
+    if pending >= INSERT_BATCH_SIZE:
+        flush_results()
 
 
 def clear_results_table() -> None:
     """Clear all results from the table."""
-    ensure_results_table()
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute("TRUNCATE TABLE tester_results;")
-        conn.commit()
+    global _flush_timer
+    with _FLUSH_LOCK, _BUFFER_LOCK:
+        # Pending rows belong to the results being cleared
+        _RESULT_BUFFER.clear()
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        _ensure_results_table_once()
+        with pooled_conn() as conn, conn.cursor() as cur:
+            cur.execute("TRUNCATE TABLE tester_results;")
+    _invalidate_db_stats()
     logger.info("Cleared results table")
 
 
 def db_stats() -> Dict[str, Any]:
-    """Get database statistics."""
-    ensure_results_table()
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute("SELECT COUNT(*), COALESCE(SUM(pg_column_size(summary)), 0) FROM tester_results;")
-        count_row = cur.fetchone() or (0, 0)
-
-        cur.execute(
-            "SELECT pg_database_size(current_database()), pg_size_pretty(pg_database_size(current_database()));"
-        )
-        db_row = cur.fetchone() or (0, "0 bytes")
-
-        cur.execute("SELECT pg_total_relation_size('tester_results');")
-        table_bytes = cur.fetchone()
-
-    return {
-        "results_rows": int(count_row[0]),
-        "results_payload_bytes": int(count_row[1]),
-        "database_bytes": int(db_row[0]),
-        "database_pretty": str(db_row[1]),
-        "results_table_bytes": int(table_bytes[0]) if table_bytes and table_bytes[0] is not None else 0,
+    """Get database statistics (cached for DB_STATS_TTL_SECONDS; status polls hit this often)."""
+    now = time.monotonic()
+    with _STATS_LOCK:
+        cached = _STATS_CACHE["value"]
+        if cached is not None and now - _STATS_CACHE["ts"] < DB_STATS_TTL_SECONDS:
+            return dict(cached)
+
+    _ensure_results_table_once()
+    with pooled_conn() as conn, conn.cursor() as cur:
+        cur.execute(DB_STATS_SQL)
+        row = cur.fetchone() or (0, 0, 0, "0 bytes", 0)
+
+    stats = {
+        "results_rows": int(row[0]),
+        "results_payload_bytes": int(row[1]),
+        "database_bytes": int(row[2]),
+        "database_pretty": str(row[3]),
+        "results_table_bytes": int(row[4]) if row[4] is not None else 0,
     }
+    with _STATS_LOCK:
+        _STATS_CACHE["ts"] = now
+        _STATS_CACHE["value"] = stats
+    return dict(stats)
+
+
+def _invalidate_db_stats() -> None:
+    with _STATS_LOCK:
+        _STATS_CACHE["value"] = None
+
+
+atexit.register(flush_results)
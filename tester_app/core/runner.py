@@ -5,32 +5,87 @@ Permutation runner for testing multiple parameter combinations.
 from __future__ import annotations
 
 import concurrent.futures
-import itertools
 import logging
+import math
+import multiprocessing
+import os
 import threading
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from tester_app.strategies import get_registry
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Job:
     """Represents a single backtest job."""
     strategy_name: str
     symbol: str
     params: Dict[str, Any]
+    # Filled on the first __hash__ call; decoding and unpickling jobs never pays for it
+    _hash: Optional[int] = field(default=None, init=False, repr=False, compare=False)
 
     def describe(self) -> Dict[str, Any]:
         return {"strategy": self.strategy_name, "symbol": self.symbol, **self.params}
 
     def __hash__(self) -> int:
-        items = tuple(sorted(self.params.items()))
-        return hash((self.strategy_name, self.symbol, items))
+        if self._hash is None:
+            items = tuple(sorted(self.params.items()))
+            object.__setattr__(self, "_hash", hash((self.strategy_name, self.symbol, items)))
+        return self._hash
+
+    def __reduce__(self):
+        # Rebuild on unpickle: str hashes are salted per process, so the cached value can't travel
+        return (Job, (self.strategy_name, self.symbol, self.params))
+
+
+class JobSpace:
+    """
+    Lazily indexable view of every job for a strategy's parameter ranges.
+
+    Jobs come out in the same order as the nested symbol/itertools.product
+    loops would produce them, but each one is built only when it is indexed,
+    so large sweeps never hold the whole job list in memory.
+    """
+
+    def __init__(self, strategy_name: str, param_ranges: Dict[str, Any]):
+        self.strategy_name = strategy_name
+        self._symbols: List[str] = list(param_ranges.get("symbols", []))
+
+        # Convert single values to lists for consistency
+        self._param_names: List[str] = []
+        self._param_values: List[List[Any]] = []
+        for key, value in param_ranges.items():
+            if key == "symbols":
+                continue
+            self._param_names.append(key)
+            self._param_values.append(value if isinstance(value, list) else [value])
+
+        self._combos = math.prod(len(values) for values in self._param_values)
+        self.total = len(self._symbols) * self._combos
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __getitem__(self, index: int) -> Job:
+        if not 0 <= index < self.total:
+            raise IndexError(index)
+
+        # Mixed-radix decode; the last parameter varies fastest, as in itertools.product
+        symbol_index, remainder = divmod(index, self._combos)
+        picks: List[Any] = []
+        for values in reversed(self._param_values):
+            remainder, position = divmod(remainder, len(values))
+            picks.append(values[position])
+        params = dict(zip(self._param_names, reversed(picks)))
+        return Job(strategy_name=self.strategy_name, symbol=self._symbols[symbol_index], params=params)
+
+    def __iter__(self) -> Iterator[Job]:
+        return (self[index] for index in range(self.total))
 
 
 class JobGenerator:
@@ -47,40 +102,114 @@ class JobGenerator:
         param_ranges should contain:
         - symbols: List[str]
         - For each parameter: either a single value or a list of values
+
+        PermutationRunner indexes a JobSpace directly instead of materializing this list.
         """
-        symbols = param_ranges.get("symbols", [])
-        if not symbols:
-            return []
+        jobs = list(JobSpace(strategy_name, param_ranges))
+        logger.info(f"Generated {len(jobs)} jobs for strategy {strategy_name}")
+        return jobs
 
-        # Extract all other parameters
-        other_params = {k: v for k, v in param_ranges.items() if k != "symbols"}
 
-        # Convert single values to lists for consistency
-        param_lists = {}
-        for key, value in other_params.items():
-            if isinstance(value, list):
-                param_lists[key] = value
-            else:
-                param_lists[key] = [value]
-
-        # Generate all combinations
-        jobs: List[Job] = []
-        if not param_lists:
-            # No parameters to vary, just one job per symbol
-            for symbol in symbols:
-                jobs.append(Job(strategy_name=strategy_name, symbol=symbol, params={}))
-        else:
-            # Generate cartesian product of all parameter values
-            param_names = list(param_lists.keys())
-            param_values = [param_lists[name] for name in param_names]
-
-            for symbol in symbols:
-                for value_combo in itertools.product(*param_values):
-                    params = dict(zip(param_names, value_combo))
-                    jobs.append(Job(strategy_name=strategy_name, symbol=symbol, params=params))
+# Jobs are handed to the pool in batches so short backtests don't pay per-task
+# dispatch/pickling; the cap keeps pause and progress reporting responsive.
+MAX_JOB_BATCH = 32
 
-        logger.info(f"Generated {len(jobs)} jobs for strategy {strategy_name}")
-        return jobs
+
+# (epoch second, ISO string); last_run_at is only ever shown to the second
+_RUN_STAMP: Tuple[int, str] = (-1, "")
+
+
+def _utc_now_iso() -> str:
+    """Current UTC time as ISO 8601, formatted at most once per second."""
+    global _RUN_STAMP
+    second = int(time.time())
+    if _RUN_STAMP[0] != second:
+        _RUN_STAMP = (second, datetime.fromtimestamp(second, timezone.utc).isoformat())
+    return _RUN_STAMP[1]
+
+
+def cpu_budget() -> int:
+    """
+    Cores all backtest process pools in one app may use together: BACKTEST_CPU_BUDGET,
+    else one per core, leaving one for the API and DB writes.
+    """
+    configured = os.getenv("BACKTEST_CPU_BUDGET")
+    if configured:
+        return max(1, int(configured))
+    return max(2, (os.cpu_count() or 2) - 1)
+
+
+def default_max_workers(reserved: int = 0) -> int:
+    """Worker count for unconfigured runners: the CPU budget less `reserved` cores used by other pools."""
+    return max(1, cpu_budget() - reserved)
+
+
+def _worker_context() -> multiprocessing.context.BaseContext:
+    """Start method for job processes: never fork the multi-threaded runner process."""
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    if context.get_start_method() == "forkserver":
+        context.set_forkserver_preload([__name__])
+    return context
+
+
+def _init_worker() -> None:
+    """Process-pool initializer: discover strategies once per worker process."""
+    get_registry()
+
+
+def _run_job(job: Job, base_config: Dict[str, Any], test_name: Optional[str]) -> Dict[str, Any]:
+    """Execute a single backtest job (module-level so process pools can pickle it)."""
+    # Merge base config with job params (copy + in-place merge beats re-splatting both dicts)
+    config = base_config.copy()
+    config |= job.params
+    config["symbol"] = job.symbol
+
+    # Run the strategy
+    registry = get_registry()
+    result = registry.run_strategy(job.strategy_name, config, write_csv=False)
+
+    # Extract or create summary
+    summary = result.get("summary")
+    if not summary:
+        logger.warning(f"No trades for {job.symbol} with {job.params}")
+        summary = {
+            "trades": 0,
+            "wins": 0,
+            "losses": 0,
+            "winrate_percent": 0.0,
+            "net_rupees": 0.0,
+            "gross_rupees": 0.0,
+            "costs_rupees": 0.0,
+            "roi_percent": 0.0,
+            "risk_reward": 0.0,
+            "last_run_at": _utc_now_iso(),
+            "no_trades_reason": result.get("message", "No trades generated"),
+        }
+    else:
+        summary["last_run_at"] = _utc_now_iso()
+
+    return {
+        "strategy": job.strategy_name,
+        "symbol": job.symbol,
+        "params": job.params,
+        "summary": summary,
+        "test_name": test_name,
+    }
+
+
+def _run_job_batch(
+    jobs: List[Job], base_config: Dict[str, Any], test_name: Optional[str]
+) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """Run several jobs in one pool task; returns (payload, error) per job so one failure doesn't sink the batch."""
+    outcomes: List[Tuple[Optional[Dict[str, Any]], Optional[str]]] = []
+    for job in jobs:
+        try:
+            outcomes.append((_run_job(job, base_config, test_name), None))
+        except Exception as exc:
+            logger.exception(f"Job failed: {exc}")
+            outcomes.append((None, str(exc)))
+    return outcomes
 
 
 class PermutationRunner:
@@ -97,6 +226,7 @@ class PermutationRunner:
         max_workers: int = 2,
         on_result_callback: Optional[callable] = None,
         test_name: Optional[str] = None,
+        use_processes: bool = True,
     ):
         self.strategy_name = strategy_name
         self.base_config = base_config
@@ -104,20 +234,31 @@ class PermutationRunner:
         self.max_workers = max(1, max_workers)
         self.on_result_callback = on_result_callback
         self.test_name = test_name
+        # Backtests are CPU-bound, so worker processes sidestep the GIL; pass
+        # use_processes=False for strategies that mostly wait on I/O.
+        self.use_processes = use_processes
 
         # Generate jobs
-        self._all_jobs: List[Job] = JobGenerator.generate_jobs(strategy_name, param_ranges)
-        self.total_jobs = len(self._all_jobs)
+        self._jobs = JobSpace(strategy_name, param_ranges)
+        self.total_jobs = len(self._jobs)
+        logger.info(f"Prepared {self.total_jobs} jobs for strategy {strategy_name}")
 
         # State management
         self._index = 0
         self._lock = threading.Lock()
         self._thread: Optional[threading.Thread] = None
-        self._pause_event = threading.Event()
-        self._pause_event.clear()
+        # Kept across pause/resume and re-runs so worker processes stay warm; torn down by reset()
+        self._executor: Optional[concurrent.futures.Executor] = None
+        self._executor_workers = 0
+        # Plain flag read by the run loop; written under _wake so waiters see the change
+        self._paused = True
+        # Signalled on job completion and on start/pause/reset so the run loop never polls
+        self._wake = threading.Condition()
         self._stop_requested = False
         self.running = False
-        self._current_jobs: Set[Job] = set()
+        # Index ranges of the batches handed to the pool, one per busy worker;
+        # descriptions are only built when status() asks
+        self._active_batches: List[range] = []
         self.last_result: Optional[Dict[str, Any]] = None
         self.last_error: Optional[str] = None
         self._completed_count = 0
@@ -139,9 +280,11 @@ class PermutationRunner:
             if max_workers is not None:
                 self.max_workers = max(1, max_workers)
             if param_ranges is not None:
-                self.param_ranges = param_ranges
-                self._all_jobs = JobGenerator.generate_jobs(self.strategy_name, param_ranges)
-                self.total_jobs = len(self._all_jobs)
+                # /configure often resends identical ranges (e.g. only max_workers changed)
+                if param_ranges != self.param_ranges:
+                    self.param_ranges = param_ranges
+                    self._jobs = JobSpace(self.strategy_name, param_ranges)
+                    self.total_jobs = len(self._jobs)
                 self._index = 0
                 self._completed_count = 0
             if test_name is not None:
@@ -151,35 +294,43 @@ class PermutationRunner:
         """Reset the runner to initial state."""
         with self._lock:
             self._stop_requested = True
-            self._pause_event.set()
+        self._set_paused(False)
         if self._thread and self._thread.is_alive():
             self._thread.join()
+        # Outside _lock: waits for batches still running when the stop was requested
+        self._shutdown_executor()
         with self._lock:
             self._index = 0
             self._completed_count = 0
-            self._current_jobs.clear()
+            self._active_batches.clear()
             self.last_result = None
             self.last_error = None
             self._stop_requested = False
             self.running = False
             self._thread = None
-            self._pause_event = threading.Event()
+            self._paused = True
         logger.info("Runner reset")
 
     def start(self) -> None:
         """Start or resume the runner."""
         with self._lock:
             if self._thread and self._thread.is_alive():
-                self._pause_event.set()
                 self.running = True
+                self._set_paused(False)
                 logger.info("Runner resumed")
                 return
 
             if self._index >= self.total_jobs:
                 self._index = 0
                 self._completed_count = 0
-            self._pause_event.set()
+            self._set_paused(False)
             self._stop_requested = False
+            # No point starting more workers than there are jobs; resize a kept pool if that changed
+            pool_size = max(1, min(self.max_workers, self.total_jobs))
+            if self._executor is not None and self._executor_workers != pool_size:
+                self._shutdown_executor()
+            if self._executor is None:
+                self._executor = self._create_executor(pool_size)
             self._thread = threading.Thread(target=self._run_loop, daemon=True)
             self._thread.start()
             self.running = True
@@ -187,126 +338,120 @@ class PermutationRunner:
 
     def pause(self) -> None:
         """Pause the runner."""
-        self._pause_event.clear()
+        self._set_paused(True)
         self.running = False
         logger.info("Runner paused")
 
-    def _next_job(self) -> Optional[Job]:
-        """Get the next job to process."""
+    def _create_executor(self, workers: int) -> concurrent.futures.Executor:
+        self._executor_workers = workers
+        if self.use_processes:
+            return concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=_worker_context(), initializer=_init_worker
+            )
+        return concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+    def _shutdown_executor(self) -> None:
+        # Only called once no run loop is using the executor
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._executor_workers = 0
+
+    def _notify(self) -> None:
+        with self._wake:
+            self._wake.notify_all()
+
+    def _set_paused(self, paused: bool) -> None:
+        with self._wake:
+            self._paused = paused
+            self._wake.notify_all()
+
+    def _claim_jobs(self, count: int) -> range:
+        """Take up to `count` job indices off the cursor and record them as one in-flight batch."""
         with self._lock:
-            if self._index >= self.total_jobs:
-                return None
-            job = self._all_jobs[self._index]
-            self._index += 1
-            return job
+            end = min(self._index + max(count, 0), self.total_jobs)
+            indices = range(self._index, end)
+            self._index = end
+            if indices:
+                self._active_batches.append(indices)
+        return indices
 
     def _run_loop(self) -> None:
         """Main execution loop (runs in background thread)."""
         self.running = True
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            active: Dict[concurrent.futures.Future, Job] = {}
-            while not self._stop_requested:
-                self._pause_event.wait()
-                if self._stop_requested:
+        executor = self._executor
+        workers = self._executor_workers
+        batch_size = max(1, min(MAX_JOB_BATCH, self.total_jobs // (workers * 8)))
+        # Progress is logged roughly every 1% rather than per job
+        log_every = max(1, self.total_jobs // 100)
+        active: Dict[concurrent.futures.Future, range] = {}
+        while not self._stop_requested:
+            # Refill every free worker slot; whichever slot frees up first takes the
+            # next batch, so uneven job durations balance without per-worker queues
+            while not self._paused and len(active) < workers:
+                indices = self._claim_jobs(batch_size)
+                if not indices:
                     break
+                batch = [self._jobs[index] for index in indices]
+                future = executor.submit(_run_job_batch, batch, self.base_config, self.test_name)
+                active[future] = indices
+                future.add_done_callback(lambda _: self._notify())
+
+            # Check if we're done
+            if not active and self._index >= self.total_jobs:
+                logger.info("Runner completed all jobs")
+                self.running = False
+                self._paused = True
+                return
 
-                while self._pause_event.is_set() and not self._stop_requested:
-                    # Submit new jobs up to max_workers
-                    while len(active) < self.max_workers:
-                        job = self._next_job()
-                        if job is None:
-                            break
-                        future = executor.submit(self._run_single_job, job)
-                        active[future] = job
-                        with self._lock:
-                            self._current_jobs.add(job)
-
-                    # Check if we're done
-                    if not active:
-                        if self._index >= self.total_jobs:
-                            logger.info("Runner completed all jobs")
-                            self.running = False
-                            self._pause_event.clear()
-                            return
-                        time.sleep(0.1)
-                        continue
-
-                    # Wait for at least one job to complete
-                    done, _ = concurrent.futures.wait(
-                        active.keys(),
-                        timeout=0.5,
-                        return_when=concurrent.futures.FIRST_COMPLETED,
+            # Block until a batch finishes or start/pause/reset changes what we can do
+            with self._wake:
+                while not (
+                    self._stop_requested
+                    or any(fut.done() for fut in active)
+                    or (
+                        not self._paused
+                        and len(active) < workers
+                        and self._index < self.total_jobs
                     )
-                    if not done:
-                        continue
-
-                    # Process completed jobs
-                    for fut in done:
-                        job = active.pop(fut)
-                        with self._lock:
-                            self._current_jobs.discard(job)
+                ):
+                    self._wake.wait()
+
+            # Process completed batches
+            for fut in [fut for fut in active if fut.done()]:
+                indices = active.pop(fut)
+                with self._lock:
+                    self._active_batches.remove(indices)
+                try:
+                    outcomes = fut.result()
+                except Exception as exc:
+                    # The task itself failed (e.g. a worker process died)
+                    logger.exception(f"Job batch failed: {exc}")
+                    outcomes = [(None, str(exc))] * len(indices)
+                    if isinstance(exc, concurrent.futures.BrokenExecutor) and executor is self._executor:
+                        # A dead worker poisons the pool for good; swap in a fresh one
+                        executor.shutdown(wait=False)
+                        executor = self._executor = self._create_executor(workers)
+
+                for result_payload, error in outcomes:
+                    if error is None:
                         try:
-                            result_payload = fut.result()
                             self.last_result = result_payload
                             self.last_error = None
                             if self.on_result_callback:
                                 self.on_result_callback(result_payload)
                         except Exception as exc:
-                            self.last_error = str(exc)
-                            logger.exception(f"Job failed: {exc}")
-                        finally:
-                            with self._lock:
-                                self._completed_count += 1
-                                completed = self._completed_count
-                            logger.info(f"Job {completed}/{self.total_jobs} completed")
-
-                    # Final check
-                    if self._index >= self.total_jobs and not active:
-                        logger.info("Runner completed all jobs")
-                        self.running = False
-                        self._pause_event.clear()
-                        return
-
-                time.sleep(0.1)
+                            error = str(exc)
+                            logger.exception(f"Result callback failed: {exc}")
+                    if error is not None:
+                        self.last_error = error
+                    with self._lock:
+                        self._completed_count += 1
+                        completed = self._completed_count
+                    if completed % log_every == 0 or completed == self.total_jobs:
+                        logger.info(f"Job {completed}/{self.total_jobs} completed")
         self.running = False
 
-    def _run_single_job(self, job: Job) -> Dict[str, Any]:
-        """Execute a single backtest job."""
-        # Merge base config with job params
-        config = {**self.base_config, **job.params, "symbol": job.symbol}
-
-        # Run the strategy
-        registry = get_registry()
-        result = registry.run_strategy(job.strategy_name, config, write_csv=False)
-
-        # Extract or create summary
-        summary = result.get("summary")
-        if not summary:
-            logger.warning(f"No trades for {job.symbol} with {job.params}")
-            summary = {
-                "trades": 0,
-                "wins": 0,
-                "losses": 0,
-                "winrate_percent": 0.0,
-                "net_rupees": 0.0,
-                "gross_rupees": 0.0,
-                "costs_rupees": 0.0,
-                "roi_percent": 0.0,
-                "risk_reward": 0.0,
-                "last_run_at": datetime.now(timezone.utc).isoformat(),
-                "no_trades_reason": result.get("message", "No trades generated"),
-            }
-        else:
-            summary["last_run_at"] = datetime.now(timezone.utc).isoformat()
-
-        return {
-            "strategy": job.strategy_name,
-            "symbol": job.symbol,
-            "params": job.params,
-            "summary": summary,
-            "test_name": self.test_name,
-        }
-
     @property
     def completed_jobs(self) -> int:
         """Get the number of completed jobs."""
@@ -316,18 +461,25 @@ class PermutationRunner:
     def status(self) -> Dict[str, Any]:
         """Get the current status of the runner."""
         with self._lock:
-            current_jobs = [job.describe() for job in self._current_jobs]
+            batches = list(self._active_batches)
+            jobs = self._jobs
             completed = self._completed_count
-            is_running = self.running and self._pause_event.is_set()
+            is_running = self.running and not self._paused
+        # One busy worker per in-flight batch; the parent can't see which job of a
+        # batch a worker process is on, so each batch is shown by its first job and
+        # the rest are reported as queued. Decoded outside the lock (immutable space).
+        current_jobs = [jobs[batch[0]].describe() for batch in batches]
+        queued = sum(len(batch) for batch in batches) - len(batches)
 
         remaining = max(self.total_jobs - completed, 0)
         progress = (completed / self.total_jobs * 100) if self.total_jobs else 0.0
 
         return {
             "running": is_running,
-            "paused": not self._pause_event.is_set() and not self._stop_requested and completed > 0,
+            "paused": self._paused and not self._stop_requested and completed > 0,
             "current_jobs": current_jobs,
             "active_workers": len(current_jobs),
+            "queued_jobs": queued,
             "completed_jobs": completed,
             "total_jobs": self.total_jobs,
             "remaining_jobs": remaining,
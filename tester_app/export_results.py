@@ -9,15 +9,20 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import json
+import csv
+import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
 
+import orjson
 import pandas as pd
 import psycopg2.extras as extras
 
-from tsdb_pipeline import get_conn
+from tsdb_pipeline import get_conn, pooled_conn
+
+logger = logging.getLogger(__name__)
 
 SUMMARY_KEYS = [
     "trades",
@@ -33,36 +38,111 @@ SUMMARY_KEYS = [
 ]
 
 
+RESULT_COLUMNS = ["id", "created_at", "strategy", "symbol", "exchange", "interval", "test_name"]
+
+RESULTS_SQL = """
+    SELECT id, created_at, strategy, symbol, exchange, interval, test_name, params, summary
+    FROM tester_results
+    {where_clause}
+    ORDER BY created_at ASC;
+"""
+
+
+def _results_filter(ids: Optional[List[str]]) -> Tuple[str, Dict[str, Any]]:
+    if not ids:
+        return "", {}
+    # Cast the array elements to UUID type to match the id column type
+    return "WHERE id = ANY(%(ids)s::uuid[])", {"ids": ids}
+
+
+# Column order of RESULTS_SQL, for rows read through iter_result_rows()
+RESULT_ROW_FIELDS = RESULT_COLUMNS + ["params", "summary"]
+
+
+def _iter_rows(ids: Optional[List[str]], batch_size: int, cursor_factory: Any = None) -> Iterator[Any]:
+    where_clause, params = _results_filter(ids)
+    query = RESULTS_SQL.format(where_clause=where_clause)
+
+    conn = get_conn()
+    try:
+        # Unique name: several exports/history reads may be in flight at once
+        with conn.cursor(name=f"tester_results_{uuid4().hex}", cursor_factory=cursor_factory) as cur:
+            cur.itersize = batch_size
+            cur.execute(query, params)
+            yield from cur
+    finally:
+        conn.close()
+
+
+def iter_results(ids: Optional[List[str]] = None, batch_size: int = 2000) -> Iterator[Dict[str, Any]]:
+    """Stream tester_results rows through a server-side cursor, batch_size rows per round trip."""
+    return _iter_rows(ids, batch_size, extras.RealDictCursor)
+
+
+def iter_result_rows(ids: Optional[List[str]] = None, batch_size: int = 2000) -> Iterator[Tuple[Any, ...]]:
+    """Like iter_results, but yields plain tuples in RESULT_ROW_FIELDS order (no per-row dict)."""
+    return _iter_rows(ids, batch_size)
+
+
 def fetch_results(ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
-    sql = """
-        SELECT id, created_at, strategy, symbol, exchange, interval, test_name, params, summary
-        FROM tester_results
-        {where_clause}
-        ORDER BY created_at ASC;
+    return list(iter_results(ids=ids))
+
+
+def export_field_order(ids: Optional[List[str]] = None) -> List[str]:
     """
-    where_clause = ""
-    params: Dict[str, Any] = {}
-    if ids:
-        # Cast the array elements to UUID type to match the id column type
-        where_clause = "WHERE id = ANY(%(ids)s::uuid[])"
-        params["ids"] = ids
+    Column order produced by flatten_row for the selected rows, computed in SQL
+    from the JSONB keys so the CSV header can be written before any row is read.
+    Returns an empty list when there are no matching rows.
+    """
+    where_clause, params = _results_filter(ids)
+    sql = f"""
+        SELECT 'params' AS source, key
+        FROM (SELECT DISTINCT jsonb_object_keys(params) AS key FROM tester_results {where_clause}) p
+        UNION ALL
+        SELECT 'summary' AS source, key
+        FROM (SELECT DISTINCT jsonb_object_keys(summary) AS key FROM tester_results {where_clause}) s
+        UNION ALL
+        SELECT 'rows' AS source, NULL
+        WHERE EXISTS (SELECT 1 FROM tester_results {where_clause});
+    """
+    with pooled_conn() as conn, conn.cursor() as cur:
+        cur.execute(sql, params)
+        key_rows = cur.fetchall()
+
+    if not any(source == "rows" for source, _ in key_rows):
+        return []
+
+    param_keys = sorted(key for source, key in key_rows if source == "params")
+    summary_keys = {key for source, key in key_rows if source == "summary"}
+    ordered_summary = [key for key in SUMMARY_KEYS if key in summary_keys]
+    ordered_summary += sorted(summary_keys.difference(SUMMARY_KEYS))
+
+    return (
+        RESULT_COLUMNS
+        + [f"param_{key}" for key in param_keys]
+        + [f"summary_{key}" for key in ordered_summary]
+    )
 
-    query = sql.format(where_clause=where_clause)
 
-    with get_conn() as conn, conn.cursor(cursor_factory=extras.RealDictCursor) as cur:
-        cur.execute(query, params)
-        rows = cur.fetchall()
-    return rows or []
+_warned_text_jsonb = False
 
 
-def flatten_row(row: Dict[str, Any]) -> Dict[str, Any]:
-    params = row.get("params") or {}
-    if isinstance(params, str):
-        params = json.loads(params)
+def _jsonb_value(value: Any) -> Dict[str, Any]:
+    """psycopg2 decodes JSONB to dicts already; text payloads are a fallback worth flagging once."""
+    global _warned_text_jsonb
+    if not value:
+        return {}
+    if isinstance(value, (str, bytes)):
+        if not _warned_text_jsonb:
+            _warned_text_jsonb = True
+            logger.warning("tester_results JSON columns arrived as text; decoding them per row")
+        return orjson.loads(value)
+    return value
 
-    summary = row.get("summary") or {}
-    if isinstance(summary, str):
-        summary = json.loads(summary)
+
+def flatten_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    params = _jsonb_value(row.get("params"))
+    summary = _jsonb_value(row.get("summary"))
 
     flat: Dict[str, Any] = {
         "id": row.get("id"),
@@ -90,26 +170,95 @@ def flatten_row(row: Dict[str, Any]) -> Dict[str, Any]:
     return flat
 
 
+_PARAMS_INDEX = RESULT_ROW_FIELDS.index("params")
+_SUMMARY_INDEX = RESULT_ROW_FIELDS.index("summary")
+
+FlattenPlan = Tuple[List[int], List[str], List[str]]
+
+
+def build_flatten_plan(field_order: List[str]) -> FlattenPlan:
+    """
+    Resolve export columns (as ordered by export_field_order) to tuple
+    positions and JSONB keys once, so per-row flattening is a straight
+    lookup instead of re-sorting keys and building column names for every row.
+    """
+    row_indices = [RESULT_ROW_FIELDS.index(name) for name in field_order if name in RESULT_COLUMNS]
+    param_keys = [name[len("param_"):] for name in field_order if name.startswith("param_")]
+    summary_keys = [name[len("summary_"):] for name in field_order if name.startswith("summary_")]
+
+    expected = (
+        [RESULT_ROW_FIELDS[index] for index in row_indices]
+        + [f"param_{key}" for key in param_keys]
+        + [f"summary_{key}" for key in summary_keys]
+    )
+    if expected != list(field_order):
+        raise ValueError("field_order must list result columns, then param_*, then summary_* columns")
+    return row_indices, param_keys, summary_keys
+
+
+def flatten_values(row: Tuple[Any, ...], plan: FlattenPlan) -> List[Any]:
+    """Values of an iter_result_rows() tuple in plan order; same values as flatten_row, missing keys as None."""
+    row_indices, param_keys, summary_keys = plan
+    params = _jsonb_value(row[_PARAMS_INDEX])
+    summary = _jsonb_value(row[_SUMMARY_INDEX])
+
+    values = [row[index] for index in row_indices]
+    values += [params.get(key) for key in param_keys]
+    values += [summary.get(key) for key in summary_keys]
+    return values
+
+
 def export_results(format: str, output_path: Path, ids: Optional[List[str]] = None) -> Path:
-    rows = fetch_results(ids=ids)
-    if not rows:
-        raise RuntimeError("tester_results table is empty. Run the tester first.")
+    if format not in {"csv", "xlsx", "excel"}:
+        raise ValueError(f"Unsupported format: {format}")
 
-    flat_rows = [flatten_row(row) for row in rows]
-    df = pd.DataFrame(flat_rows)
+    # Column order comes from SQL up front, so neither format has to merge keys row by row
+    field_order = export_field_order(ids)
+    if not field_order:
+        raise RuntimeError("tester_results table is empty. Run the tester first.")
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    plan = build_flatten_plan(field_order)
+    rows = (flatten_values(row, plan) for row in iter_result_rows(ids))
 
     if format == "csv":
-        df.to_csv(output_path, index=False)
-    elif format in {"xlsx", "excel"}:
-        df.to_excel(output_path, index=False)
-    else:
-        raise ValueError(f"Unsupported format: {format}")
-
+        # Rows stream straight from the cursor to disk
+        with output_path.open("w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(field_order)
+            writer.writerows(rows)
+        return output_path
+
+    _write_xlsx(output_path, field_order, rows)
     return output_path
 
 
+def _write_xlsx(output_path: Path, field_order: List[str], rows: Iterator[List[Any]]) -> None:
+    """
+    Stream rows into the sheet with xlsxwriter's constant_memory mode, which
+    keeps only the current row in memory; without xlsxwriter, go through pandas.
+    """
+    try:
+        import xlsxwriter  # pylint: disable=import-error
+    except ImportError:
+        pd.DataFrame(list(rows), columns=field_order).to_excel(output_path, index=False)
+        return
+
+    # Excel has no timezone-aware datetimes; created_at is written as its UTC wall time
+    workbook = xlsxwriter.Workbook(
+        str(output_path),
+        {"constant_memory": True, "remove_timezone": True, "default_date_format": "yyyy-mm-dd hh:mm:ss"},
+    )
+    try:
+        sheet = workbook.add_worksheet()
+        sheet.add_write_handler(UUID, lambda ws, row, col, value, fmt=None: ws.write_string(row, col, str(value), fmt))
+        sheet.write_row(0, 0, field_order)
+        for row_number, values in enumerate(rows, start=1):
+            sheet.write_row(row_number, 0, values)
+    finally:
+        workbook.close()
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Export tester results to CSV or Excel.")
     parser.add_argument(
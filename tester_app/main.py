@@ -9,19 +9,22 @@ import io
 import logging
 import os
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException
 from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 
 from tester_app.strategies import get_registry
-from tester_app.core.runner import PermutationRunner, JobGenerator
+from tester_app.core.runner import PermutationRunner, JobGenerator, default_max_workers
 from tester_app.core.database import (
     ensure_results_table,
+    flush_pending_results,
+    flush_results,
     insert_result,
     clear_results_table,
     db_stats,
@@ -35,7 +38,8 @@ BASE_DIR = Path(__file__).resolve().parent
 
 # Initialize FastAPI app
 app = FastAPI(title="Strategy Tester App", version="2.0.0")
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+TEMPLATES_DIR = BASE_DIR / "templates"
+templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
 
 # Initialize strategy registry
@@ -93,7 +97,7 @@ def get_or_create_runner() -> PermutationRunner:
             "enable_eod_square_off": [True],
         }
 
-        max_workers = int(os.getenv("TESTER_MAX_WORKERS", "2"))
+        max_workers = int(os.getenv("TESTER_MAX_WORKERS", str(default_max_workers())))
         current_runner = PermutationRunner(
             strategy_name=current_strategy,
             base_config=current_base_config,
@@ -105,6 +109,13 @@ def get_or_create_runner() -> PermutationRunner:
     return current_runner
 
 
+def _control_status(runner: PermutationRunner) -> Dict[str, Any]:
+    """Runner status plus database stats (db_stats is cached briefly, so this is one query at most)."""
+    status = runner.status()
+    status["database"] = db_stats()
+    return status
+
+
 # ------------ Pydantic Models ------------
 
 class ControlResponse(BaseModel):
@@ -151,10 +162,17 @@ class HistoryItem(BaseModel):
 
 # ------------ API Routes ------------
 
+@lru_cache(maxsize=8)
+def _render_page(name: str, mtime_ns: int) -> str:
+    """The UI templates take no per-request context, so each file version renders once."""
+    return templates.get_template(name).render()
+
+
 @app.get("/", response_class=HTMLResponse)
-def index(request: Request):
+def index() -> HTMLResponse:
     """Render the main UI."""
-    return templates.TemplateResponse("index.html", {"request": request})
+    # Keyed on mtime so template edits still show up without a restart
+    return HTMLResponse(_render_page("index.html", (TEMPLATES_DIR / "index.html").stat().st_mtime_ns))
 
 
 @app.get("/strategies")
@@ -168,8 +186,7 @@ def list_strategies():
 def get_status():
     """Get the current runner status."""
     runner = get_or_create_runner()
-    status = runner.status()
-    status["database"] = db_stats()
+    status = _control_status(runner)
     status["test_name"] = current_test_name
     return status
 
@@ -179,9 +196,7 @@ def start_runner():
     """Start or resume the runner."""
     runner = get_or_create_runner()
     runner.start()
-    status = runner.status()
-    status["database"] = db_stats()
-    return ControlResponse(status=status)
+    return ControlResponse(status=_control_status(runner))
 
 
 @app.post("/pause", response_model=ControlResponse)
@@ -189,9 +204,7 @@ def pause_runner():
     """Pause the runner."""
     runner = get_or_create_runner()
     runner.pause()
-    status = runner.status()
-    status["database"] = db_stats()
-    return ControlResponse(status=status)
+    return ControlResponse(status=_control_status(runner))
 
 
 @app.post("/reset", response_model=ControlResponse)
@@ -199,9 +212,7 @@ def reset_runner():
     """Reset the runner."""
     runner = get_or_create_runner()
     runner.reset()
-    status = runner.status()
-    status["database"] = db_stats()
-    return ControlResponse(status=status)
+    return ControlResponse(status=_control_status(runner))
 
 
 @app.post("/configure", response_model=ControlResponse)
@@ -264,9 +275,7 @@ def configure_runner(config: ConfigRequest):
                 test_name=config.test_name,
             )
 
-        status = current_runner.status()
-        status["database"] = db_stats()
-        return ControlResponse(status=status)
+        return ControlResponse(status=_control_status(current_runner))
 
     except RuntimeError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -280,20 +289,20 @@ def clear_results():
     """Clear all results from the database."""
     clear_results_table()
     runner = get_or_create_runner()
-    status = runner.status()
-    status["database"] = db_stats()
-    return ControlResponse(status=status)
+    return ControlResponse(status=_control_status(runner))
 
 
 @app.get("/history", response_model=List[HistoryItem])
 def list_history():
     """List all stored backtest results."""
     try:
-        from tester_app.export_results import fetch_results
+        from tester_app.export_results import iter_results
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"History module unavailable: {exc}") from exc
 
-    rows = fetch_results()
+    flush_pending_results()
+
+    rows = iter_results()
     history: List[HistoryItem] = []
     for row in rows:
         params = row.get("params") or {}
@@ -314,43 +323,46 @@ def list_history():
     return history
 
 
+EXPORT_CHUNK_ROWS = 500
+
+
 @app.get("/history/export-file")
 def history_export_csv(ids: Optional[str] = None):
     """Export history as CSV file."""
     try:
-        from tester_app.export_results import fetch_results, flatten_row
+        from tester_app.export_results import build_flatten_plan, export_field_order, flatten_values, iter_result_rows
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Export module unavailable: {exc}") from exc
 
+    flush_pending_results()
+
     id_list: Optional[List[str]] = None
     if ids:
         id_list = [candidate.strip() for candidate in ids.split(",") if candidate.strip()]
 
-    rows = fetch_results(ids=id_list)
-    if not rows:
-        raise HTTPException(status_code=404, detail="No tester results available for export.")
-
-    flattened: List[Dict[str, Any]] = [flatten_row(row) for row in rows]
-    if not flattened:
+    # The header comes from the JSONB keys in SQL, so rows can be streamed afterwards
+    field_order = export_field_order(ids=id_list)
+    if not field_order:
         raise HTTPException(status_code=404, detail="No tester results available for export.")
-
-    field_order: List[str] = list(flattened[0].keys())
-    for entry in flattened[1:]:
-        for key in entry.keys():
-            if key not in field_order:
-                field_order.append(key)
-
-    buffer = io.StringIO()
-    writer = csv.DictWriter(buffer, fieldnames=field_order, extrasaction="ignore")
-    writer.writeheader()
-    writer.writerows(flattened)
-    buffer.seek(0)
+    plan = build_flatten_plan(field_order)
+
+    def generate_csv() -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(field_order)
+        for count, row in enumerate(iter_result_rows(ids=id_list), start=1):
+            writer.writerow(flatten_values(row, plan))
+            if count % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
 
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     suffix = "subset" if id_list else "all"
     filename = f"tester_results_{suffix}_{timestamp}.csv"
     headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
-    return StreamingResponse(iter([buffer.getvalue()]), media_type="text/csv", headers=headers)
+    return StreamingResponse(generate_csv(), media_type="text/csv", headers=headers)
 
 
 # ------------ Startup/Shutdown ------------
@@ -379,4 +391,5 @@ async def shutdown_event():
     if current_runner is not None:
         logger.info("Shutting down runner...")
         current_runner.reset()
+    flush_results()
     logger.info("App shutdown complete")
@@ -118,6 +118,9 @@ function renderStatus(status) {
     if (activeJobs.length > 1) {
       fields.push(["Additional Jobs", `${activeJobs.length - 1} more running`]);
     }
+    if (status.queued_jobs) {
+      fields.push(["Queued in Batches", formatNumber(status.queued_jobs, 0)]);
+    }
   } else {
     fields.push(["Active Jobs", "0"]);
   }
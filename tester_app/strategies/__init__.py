@@ -6,12 +6,50 @@ from __future__ import annotations
 
 import importlib
 import importlib.util
+import json
 import logging
+import os
+import sys
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType, ModuleType
+from typing import Any, Dict, List, Mapping, Optional
 
 logger = logging.getLogger(__name__)
 
+# file path -> {"mtime_ns", "info"}: lets a fresh registry (every worker process
+# builds one) list unchanged strategies without importing them. Only the
+# strategy file's own mtime is tracked. Set TESTER_STRATEGY_CACHE="" to disable.
+_cache_setting = os.getenv("TESTER_STRATEGY_CACHE", str(Path.home() / ".cache" / "tester_app" / "strategies.json"))
+STRATEGY_CACHE_PATH: Optional[Path] = Path(_cache_setting) if _cache_setting else None
+
+# The app.strategies package directory (repo_root/app/strategies)
+DEFAULT_STRATEGIES_PATH = Path(__file__).resolve().parent.parent.parent / "app" / "strategies"
+# Serializes file-based imports of strategies that live outside that package
+_FILE_IMPORT_LOCK = threading.Lock()
+
+
+def _read_strategy_cache() -> Dict[str, Dict[str, Any]]:
+    if STRATEGY_CACHE_PATH is None or not STRATEGY_CACHE_PATH.exists():
+        return {}
+    try:
+        return json.loads(STRATEGY_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        logger.warning(f"Ignoring unreadable strategy cache {STRATEGY_CACHE_PATH}: {exc}")
+        return {}
+
+
+def _write_strategy_cache(cache: Dict[str, Dict[str, Any]]) -> None:
+    if STRATEGY_CACHE_PATH is None:
+        return
+    try:
+        STRATEGY_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = STRATEGY_CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(cache), encoding="utf-8")
+        tmp_path.replace(STRATEGY_CACHE_PATH)
+    except (OSError, TypeError, ValueError) as exc:
+        logger.warning(f"Could not write strategy cache {STRATEGY_CACHE_PATH}: {exc}")
+
 
 class StrategyRegistry:
     """
@@ -23,7 +61,52 @@ class StrategyRegistry:
 
     def __init__(self):
         self._strategies: Dict[str, Dict[str, Any]] = {}
+        # Read-only view and API listing handed out to every caller; the listing
+        # is rebuilt only after a registration changes it
+        self._strategies_view: Mapping[str, Dict[str, Any]] = MappingProxyType(self._strategies)
+        self._list_cache: Optional[List[Dict[str, Any]]] = None
         self._loaded = False
+        self._import_lock = threading.Lock()
+
+    @staticmethod
+    def _import_strategy(strategy_file: Path) -> Optional[ModuleType]:
+        # Use fully qualified name to fix dataclass module context
+        module_name = f"app.strategies.{strategy_file.stem}"
+        # Package strategies go through the import system, shared with the single-run
+        # loader; its per-module lock makes concurrent importers wait for a finished module
+        if strategy_file.resolve().parent == DEFAULT_STRATEGIES_PATH:
+            return importlib.import_module(module_name)
+
+        with _FILE_IMPORT_LOCK:
+            module = sys.modules.get(module_name)
+            if module is not None:
+                return module
+
+            spec = importlib.util.spec_from_file_location(module_name, strategy_file)
+            if spec is None or spec.loader is None:
+                return None
+
+            module = importlib.util.module_from_spec(spec)
+            # Register module in sys.modules BEFORE executing to fix dataclass issue
+            sys.modules[module_name] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                sys.modules.pop(module_name, None)
+                raise
+            return module
+
+    def _register(self, info: Dict[str, Any], strategy_file: Path, module: Optional[ModuleType]) -> None:
+        strategy_name = info.get("name", f"app.strategies.{strategy_file.stem}")
+        # module/run stay None for cache hits until the strategy first runs
+        self._strategies[strategy_name] = {
+            "module": module,
+            "info": info,
+            "run": module.run if module is not None else None,
+            "file": str(strategy_file),
+        }
+        self._list_cache = None
+        logger.info(f"✓ Registered strategy: {strategy_name} ({info.get('title', strategy_name)})")
 
     def discover_strategies(self, strategies_path: Optional[Path] = None) -> None:
         """
@@ -33,15 +116,15 @@ class StrategyRegistry:
             return
 
         if strategies_path is None:
-            # Go up to parent directory and look for app/strategies
-            current_dir = Path(__file__).resolve().parent.parent.parent
-            strategies_path = current_dir / "app" / "strategies"
+            strategies_path = DEFAULT_STRATEGIES_PATH
 
         if not strategies_path.exists():
             logger.warning(f"Strategies path not found: {strategies_path}")
             return
 
         logger.info(f"Discovering strategies in: {strategies_path}")
+        cache = _read_strategy_cache()
+        fresh_cache = dict(cache)
 
         # Find all .py files in strategies folder
         for strategy_file in strategies_path.glob("*.py"):
@@ -49,40 +132,37 @@ class StrategyRegistry:
                 continue
 
             try:
-                # Import the strategy module
-                # Use fully qualified name to fix dataclass module context
-                module_name = f"app.strategies.{strategy_file.stem}"
-                spec = importlib.util.spec_from_file_location(module_name, strategy_file)
-                if spec is None or spec.loader is None:
+                cache_key = str(strategy_file.resolve())
+                mtime_ns = strategy_file.stat().st_mtime_ns
+                cached = cache.get(cache_key)
+                if cached is not None and cached.get("mtime_ns") == mtime_ns:
+                    # info is None for files known not to be strategies
+                    if cached.get("info") is not None:
+                        self._register(cached["info"], strategy_file, None)
                     continue
 
-                module = importlib.util.module_from_spec(spec)
-                # Register module in sys.modules BEFORE executing to fix dataclass issue
-                import sys
-                sys.modules[module_name] = module
-                spec.loader.exec_module(module)
+                # Import the strategy module
+                module = self._import_strategy(strategy_file)
+                if module is None:
+                    continue
 
                 # Check if it has get_info and run functions
                 if not hasattr(module, "get_info") or not hasattr(module, "run"):
-                    logger.debug(f"Skipping {module_name}: missing get_info() or run()")
+                    logger.debug(f"Skipping {module.__name__}: missing get_info() or run()")
+                    fresh_cache[cache_key] = {"mtime_ns": mtime_ns, "info": None}
                     continue
 
                 # Get strategy metadata
                 info = module.get_info()
-                strategy_name = info.get("name", module_name)
-
-                self._strategies[strategy_name] = {
-                    "module": module,
-                    "info": info,
-                    "run": module.run,
-                    "file": str(strategy_file),
-                }
-
-                logger.info(f"✓ Registered strategy: {strategy_name} ({info.get('title', strategy_name)})")
+                fresh_cache[cache_key] = {"mtime_ns": mtime_ns, "info": info}
+                self._register(info, strategy_file, module)
 
             except Exception as exc:
                 logger.exception(f"Failed to load strategy from {strategy_file}: {exc}")
 
+        if fresh_cache != cache:
+            _write_strategy_cache(fresh_cache)
+
         self._loaded = True
         logger.info(f"Strategy discovery complete. Loaded {len(self._strategies)} strategies.")
 
@@ -90,14 +170,18 @@ class StrategyRegistry:
         """Get a strategy by name."""
         return self._strategies.get(name)
 
-    def get_all_strategies(self) -> Dict[str, Dict[str, Any]]:
-        """Get all registered strategies."""
-        return self._strategies.copy()
+    def get_all_strategies(self) -> Mapping[str, Dict[str, Any]]:
+        """Get all registered strategies (a read-only view, not a copy)."""
+        return self._strategies_view
 
     def list_strategies(self) -> List[Dict[str, Any]]:
         """
         List all strategies with their metadata (for API consumption).
+        The same list is returned on every call; callers must not mutate it.
         """
+        if self._list_cache is not None:
+            return self._list_cache
+
         result = []
         for name, strategy in self._strategies.items():
             info = strategy["info"]
@@ -107,6 +191,7 @@ class StrategyRegistry:
                 "description": info.get("description", ""),
                 "parameters": info.get("parameters", {}),
             })
+        self._list_cache = result
         return result
 
     def run_strategy(self, name: str, config: Dict[str, Any], write_csv: bool = False) -> Dict[str, Any]:
@@ -115,6 +200,16 @@ class StrategyRegistry:
         if strategy is None:
             raise ValueError(f"Strategy '{name}' not found")
 
+        if strategy["run"] is None:
+            # Registered from the discovery cache; import on first use
+            with self._import_lock:
+                if strategy["run"] is None:
+                    module = self._import_strategy(Path(strategy["file"]))
+                    if module is None:
+                        raise ValueError(f"Strategy '{name}' could not be imported from {strategy['file']}")
+                    strategy["module"] = module
+                    strategy["run"] = module.run
+
         return strategy["run"](config, write_csv=write_csv)
 
 
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistence helpers for backtest trade logs
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+# "csv" (default) or "parquet"; Parquet needs pyarrow and falls back to CSV without it
+TRADES_OUTPUT_FORMAT = os.getenv("TRADES_OUTPUT_FORMAT", "csv").strip().lower()
+
+
+def write_trades(trades: pd.DataFrame, base_path: str) -> str:
+    """
+    Persist a trades DataFrame and return the path written.
+
+    Writes `<base_path>.csv`, or `<base_path>.parquet` (columnar, no per-value
+    text encoding) when TRADES_OUTPUT_FORMAT=parquet and pyarrow is available.
+    """
+    if TRADES_OUTPUT_FORMAT == "parquet":
+        try:
+            import pyarrow  # noqa: F401  # pylint: disable=import-error,unused-import
+        except ImportError:
+            pass
+        else:
+            out_path = f"{base_path}.parquet"
+            trades.to_parquet(out_path, index=False)
+            return out_path
+
+    out_path = f"{base_path}.csv"
+    trades.to_csv(out_path, index=False)
+    return out_path
+
+
+def output_fields(path: Optional[str]) -> Dict[str, Any]:
+    """
+    API response fields describing a written trade log. `output_csv` is only
+    set for CSV files, so clients that read it never get a Parquet path.
+    """
+    output_format = Path(path).suffix.lstrip(".") if path else None
+    return {
+        "output_path": path,
+        "output_format": output_format,
+        "output_csv": path if output_format == "csv" else None,
+    }
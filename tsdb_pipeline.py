@@ -9,19 +9,33 @@ TimescaleDB ingest + reader for OpenAlgo OHLCV bars
 - Automatically fetches both PE and CE for option symbols
 """
 
+from __future__ import annotations
+
+import atexit
+import io
+import logging
 import os
+import struct
 import sys
-from datetime import timedelta
-from typing import Optional
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta, timezone
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+from zoneinfo import ZoneInfo
 
-import pandas as pd
 from dotenv import load_dotenv
 
-import psycopg2
-import psycopg2.extras as extras
-
 from symbol_utils import get_option_pair, is_option_symbol
 
+# pandas/numpy/psycopg2 are imported where they are used, so importing this
+# module (e.g. for the PG* settings or get_conn) doesn't pay for pandas.
+if TYPE_CHECKING:  # pragma: no cover
+    import pandas as pd
+
+
+logger = logging.getLogger(__name__)
 
 # ---------- ENV ----------
 load_dotenv()
@@ -30,6 +44,8 @@ PGPORT = int(os.getenv("PGPORT", "5432"))
 PGUSER = os.getenv("PGUSER", "postgres")
 PGPASSWORD = os.getenv("PGPASSWORD", "postgres")
 PGDATABASE = os.getenv("PGDATABASE", "trading")
+# Connections held by the process-wide pool; further borrowers wait for a free one
+PG_POOL_MAX = max(1, int(os.getenv("PG_POOL_MAX", "16")))
 
 API_KEY = os.getenv("API_KEY")
 API_HOST = os.getenv("OPENALGO_API_HOST")
@@ -38,17 +54,88 @@ API_HOST = os.getenv("OPENALGO_API_HOST")
 # ---------- CONSTANTS ----------
 IST_TZ = "Asia/Kolkata"
 
+# Optionally split history downloads into requests of this many days (0 = one
+# request per missing window), FETCH_WORKERS at a time. The defaults keep to a
+# single request in flight against the rate-limited OpenAlgo API.
+FETCH_CHUNK_DAYS = max(0, int(os.getenv("OPENALGO_FETCH_CHUNK_DAYS", "0")))
+FETCH_WORKERS = max(1, int(os.getenv("OPENALGO_FETCH_WORKERS", "1")))
+
 
 # ---------- DB ----------
+_CONNECT_KWARGS = {
+    "host": PGHOST,
+    "port": PGPORT,
+    "user": PGUSER,
+    "password": PGPASSWORD,
+    "dbname": PGDATABASE,
+    "options": "-c TimeZone=UTC",
+}
+
+
 def get_conn():
-    return psycopg2.connect(
-        host=PGHOST,
-        port=PGPORT,
-        user=PGUSER,
-        password=PGPASSWORD,
-        dbname=PGDATABASE,
-        options="-c TimeZone=UTC",
-    )
+    """Open a dedicated connection (caller closes it); prefer pooled_conn() for short queries."""
+    import psycopg2
+
+    return psycopg2.connect(**_CONNECT_KWARGS)
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+# ThreadedConnectionPool raises PoolError once every connection is lent out;
+# this makes pooled_conn() queue instead.
+_POOL_SLOTS = threading.BoundedSemaphore(PG_POOL_MAX)
+# Pools inherited through fork share sockets with the parent; keep them referenced
+# so garbage collection in the child never closes the parent's sessions.
+_FORKED_POOLS: list = []
+
+
+def _get_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            from psycopg2.pool import ThreadedConnectionPool
+
+            _POOL = ThreadedConnectionPool(1, PG_POOL_MAX, **_CONNECT_KWARGS)
+        return _POOL
+
+
+@contextmanager
+def pooled_conn() -> Iterator[Any]:
+    """
+    Borrow a connection from the process-wide pool; commits on success, rolls
+    back on error. Session settings must be SET LOCAL so they don't leak to
+    the next borrower.
+    """
+    slots = _POOL_SLOTS
+    slots.acquire()
+    try:
+        pool = _get_pool()
+        conn = pool.getconn()
+        try:
+            with conn:
+                yield conn
+        finally:
+            pool.putconn(conn, close=bool(conn.closed))
+    finally:
+        slots.release()
+
+
+def _forget_pool_after_fork() -> None:
+    global _POOL, _POOL_LOCK, _POOL_SLOTS
+    if _POOL is not None:
+        _FORKED_POOLS.append(_POOL)
+    _POOL = None
+    _POOL_LOCK = threading.Lock()
+    _POOL_SLOTS = threading.BoundedSemaphore(PG_POOL_MAX)
+
+
+def _close_pool() -> None:
+    if _POOL is not None:
+        _POOL.closeall()
+
+
+os.register_at_fork(after_in_child=_forget_pool_after_fork)
+atexit.register(_close_pool)
 
 
 SCHEMA_SQL = """
@@ -81,65 +168,184 @@ ALTER TABLE ohlcv SET (
 """
 
 
+_schema_ready = False
+
+
 def ensure_schema():
-    with get_conn() as conn, conn.cursor() as cur:
+    global _schema_ready
+    with pooled_conn() as conn, conn.cursor() as cur:
         cur.execute(SCHEMA_SQL)
         conn.commit()
+    _schema_ready = True
+
+
+def _ensure_schema_once() -> None:
+    # The DDL is idempotent but not free (extension/hypertable probes), so ingest
+    # runs it once per process rather than before every fetch
+    if not _schema_ready:
+        ensure_schema()
+
+
+# Coverage is checked before every ingest; each pooled connection parses and
+# plans the hypertable aggregate once and then only executes it.
+PREPARE_COVERAGE_SQL = """
+PREPARE series_coverage (text, text, text) AS
+SELECT MIN(ts) AS first_ts, MAX(ts) AS last_ts, COUNT(*)::bigint AS rows_count
+FROM ohlcv
+WHERE symbol = $1
+  AND exchange = $2
+  AND interval = $3;
+"""
+_COVERAGE_PREPARED: "weakref.WeakSet[Any]" = weakref.WeakSet()
 
 
 def get_series_coverage(symbol: str, exchange: str, interval: str) -> Optional[dict]:
-    """Return coverage metadata (min/max ts, row count) for a series."""
+    """
+    Return coverage metadata (min/max ts, row count) for a series.
 
-    with get_conn() as conn, conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT MIN(ts) AS first_ts, MAX(ts) AS last_ts, COUNT(*)::bigint AS rows_count
-            FROM ohlcv
-            WHERE symbol = %(symbol)s
-              AND exchange = %(exchange)s
-              AND interval = %(interval)s
-        """,
-            {"symbol": symbol, "exchange": exchange, "interval": interval},
-        )
-        row = cur.fetchone()
+    first_ts/last_ts are the tz-aware datetimes psycopg2 returns for timestamptz.
+    """
+    with pooled_conn() as conn:
+        if conn not in _COVERAGE_PREPARED:
+            with conn.cursor() as cur:
+                cur.execute(PREPARE_COVERAGE_SQL)
+            # Commit so the statement is known to outlive this transaction
+            conn.commit()
+            _COVERAGE_PREPARED.add(conn)
+        with conn.cursor() as cur:
+            cur.execute("EXECUTE series_coverage (%s, %s, %s);", (symbol, exchange, interval))
+            row = cur.fetchone()
 
     if not row or row[2] == 0:
         return None
 
-    first_ts = pd.to_datetime(row[0], utc=True) if row[0] else None
-    last_ts = pd.to_datetime(row[1], utc=True) if row[1] else None
-
     return {
-        "first_ts": first_ts,
-        "last_ts": last_ts,
+        "first_ts": row[0],
+        "last_ts": row[1],
         "rows_count": int(row[2]),
     }
 
 
-def _as_rows(df: pd.DataFrame, symbol: str, exchange: str, interval: str):
-    # Ensure DatetimeIndex
-    if not isinstance(df.index, pd.DatetimeIndex):
-        df.index = pd.to_datetime(df.index)
-
-    # Standardize to (open, high, low, close, volume, oi)
-    for ts, row in df.iterrows():
-        yield (
-            ts.to_pydatetime(),
-            symbol,
-            exchange,
-            interval,
-            float(row["open"]),
-            float(row["high"]),
-            float(row["low"]),
-            float(row["close"]),
-            float(row.get("volume", 0.0)),
-            float(row.get("oi", 0.0)) if pd.notna(row.get("oi", None)) else None,
-        )
+# Two index probes that stop at the first matching bar, instead of aggregating
+# MIN/MAX/COUNT over the whole series just to learn a window is already stored
+RANGE_COVERED_SQL = """
+SELECT EXISTS (
+           SELECT 1 FROM ohlcv
+           WHERE symbol = %(symbol)s AND exchange = %(exchange)s AND interval = %(interval)s
+             AND ts < %(start_bound)s
+       )
+   AND EXISTS (
+           SELECT 1 FROM ohlcv
+           WHERE symbol = %(symbol)s AND exchange = %(exchange)s AND interval = %(interval)s
+             AND ts >= %(end_bound)s
+       );
+"""
+
+
+def _range_covered(symbol: str, exchange: str, interval: str, start_ts: pd.Timestamp, end_ts: pd.Timestamp) -> bool:
+    """
+    True when the stored series starts on or before start_ts's IST day and ends
+    on or after end_ts's IST day, i.e. the same day-level test the ingest path
+    applies to get_series_coverage's first/last timestamps.
+    """
+    start_day = start_ts.tz_convert(IST_TZ).normalize()
+    end_day = end_ts.tz_convert(IST_TZ).normalize()
+    params = {
+        "symbol": symbol,
+        "exchange": exchange,
+        "interval": interval,
+        "start_bound": (start_day + timedelta(days=1)).to_pydatetime(),
+        "end_bound": end_day.to_pydatetime(),
+    }
+    with pooled_conn() as conn, conn.cursor() as cur:
+        cur.execute(RANGE_COVERED_SQL, params)
+        return bool(cur.fetchone()[0])
+
+
+# Binary COPY framing: signature, flags and header-extension length, then
+# tuples, then a -1 field count. timestamptz travels as microseconds since
+# 2000-01-01 UTC.
+COPY_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_BINARY_TRAILER = struct.pack("!h", -1)
+_PG_EPOCH_US = 946_684_800_000_000
+_OHLCV_FLOAT_COLUMNS = ("open", "high", "low", "close", "volume", "oi")
+
+
+def _copy_payload(df: pd.DataFrame, symbol: str, exchange: str, interval: str) -> bytes:
+    """
+    Encode bars as a binary COPY stream in OHLCV_COLUMNS order.
 
+    symbol/exchange/interval are fixed per call, so every tuple has the same
+    layout: the batch is filled column-wise into one NumPy record array and
+    dumped with tobytes(), with no Python tuple or CSV line per bar. Naive
+    timestamps are taken as UTC, the session time zone.
+    """
+    import numpy as np
+    import pandas as pd
+
+    index = df.index if isinstance(df.index, pd.DatetimeIndex) else pd.DatetimeIndex(pd.to_datetime(df.index))
+    if index.hasnans:
+        raise ValueError("OHLCV bars must all have a timestamp")
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    count = len(df)
+
+    fields = [("nfields", ">i2"), ("ts_len", ">i4"), ("ts", ">i8")]
+    texts = {"symbol": symbol.encode(), "exchange": exchange.encode(), "interval": interval.encode()}
+    for name, text in texts.items():
+        fields.append((f"{name}_len", ">i4"))
+        if text:
+            fields.append((name, f"S{len(text)}"))
+    for name in _OHLCV_FLOAT_COLUMNS:
+        fields += [(f"{name}_len", ">i4"), (name, ">f8")]
+
+    records = np.empty(count, dtype=fields)
+    records["nfields"] = 10
+    records["ts_len"] = 8
+    records["ts"] = index.as_unit("us").asi8 - _PG_EPOCH_US
+    for name, text in texts.items():
+        records[f"{name}_len"] = len(text)
+        if text:
+            records[name] = text
+    for name in _OHLCV_FLOAT_COLUMNS:
+        records[f"{name}_len"] = 8
+        if name in df.columns:
+            records[name] = df[name].to_numpy(dtype="float64")
+        else:
+            records[name] = 0.0 if name == "volume" else np.nan
+
+    # oi is the last field: a NULL is length -1 with its 8 data bytes dropped
+    oi_null = np.isnan(records["oi"])
+    if not oi_null.any():
+        return records.tobytes()
+    records["oi_len"][oi_null] = -1
+    raw = records.view(np.uint8).reshape(count, records.dtype.itemsize)
+    keep = np.ones(raw.shape, dtype=bool)
+    keep[oi_null, -8:] = False
+    return raw[keep].tobytes()
+
+
+OHLCV_COLUMNS = "ts, symbol, exchange, interval, open, high, low, close, volume, oi"
+
+# Bars are COPY'd into a transaction-scoped staging table and merged with one
+# INSERT ... SELECT; COPY skips the per-row SQL parsing of multi-row INSERTs.
+# seq lets the merge keep the last copy of any bar that appears twice.
+CREATE_STAGE_SQL = """
+CREATE TEMP TABLE ohlcv_stage (LIKE ohlcv INCLUDING DEFAULTS, seq BIGSERIAL) ON COMMIT DROP;
+"""
 
-UPSERT_SQL = """
-INSERT INTO ohlcv (ts, symbol, exchange, interval, open, high, low, close, volume, oi)
-VALUES %s
+# Ingest is an idempotent re-pull from OpenAlgo, so a crash losing the last
+# commit is harmless: skip the WAL flush wait and JIT for the bulk merge.
+# SET LOCAL scopes both to the upsert transaction on the pooled connection.
+BULK_SESSION_SQL = "SET LOCAL synchronous_commit = off; SET LOCAL jit = off;"
+
+COPY_STAGE_SQL = f"COPY ohlcv_stage ({OHLCV_COLUMNS}) FROM STDIN WITH (FORMAT binary)"
+
+UPSERT_SQL = f"""
+INSERT INTO ohlcv ({OHLCV_COLUMNS})
+SELECT DISTINCT ON (ts, symbol, exchange, interval) {OHLCV_COLUMNS}
+FROM ohlcv_stage
+ORDER BY ts, symbol, exchange, interval, seq DESC
 ON CONFLICT (ts, symbol, exchange, interval) DO UPDATE
 SET open = EXCLUDED.open,
     high = EXCLUDED.high,
@@ -150,31 +356,43 @@ SET open = EXCLUDED.open,
 """
 
 
+# create_hypertable's default chunk_time_interval; bars older than the series'
+# newest bar by more than this land in earlier (possibly compressed) chunks
+OHLCV_CHUNK_INTERVAL = timedelta(days=7)
+
+
 def upsert_ohlcv(df: pd.DataFrame, symbol: str, exchange: str, interval: str, batch: int = 5000):
     if df is None or df.empty:
         return 0
 
-    rows_iter = _as_rows(df, symbol, exchange, interval)
+    # Stage bars in time order so the merge walks chunks oldest to newest; the
+    # stable sort keeps duplicate bars in arrival order for the seq tie-break
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind="stable")
+
     affected = 0
 
-    with get_conn() as conn, conn.cursor() as cur:
-        batch_rows = []
-        for r in rows_iter:
-            batch_rows.append(r)
-            if len(batch_rows) >= batch:
-                extras.execute_values(cur, UPSERT_SQL, batch_rows, page_size=batch)
-                affected += len(batch_rows)
-                batch_rows.clear()
-        if batch_rows:
-            extras.execute_values(cur, UPSERT_SQL, batch_rows, page_size=batch)
-            affected += len(batch_rows)
+    with pooled_conn() as conn, conn.cursor() as cur:
+        cur.execute(BULK_SESSION_SQL)
+        cur.execute(CREATE_STAGE_SQL)
+        # COPY in chunks of `batch` rows so the encoded buffer stays bounded
+        for start in range(0, len(df), batch):
+            chunk = df.iloc[start:start + batch]
+            payload = _copy_payload(chunk, symbol, exchange, interval)
+            cur.copy_expert(COPY_STAGE_SQL, io.BytesIO(COPY_BINARY_HEADER + payload + COPY_BINARY_TRAILER))
+            affected += len(chunk)
+        cur.execute(UPSERT_SQL)
         conn.commit()
     return affected
 
 
 def _to_dataframe(payload) -> pd.DataFrame:
+    import pandas as pd
+
+    # The helpers below only rename/reshape into new frames, so the payload
+    # frame itself is used as-is rather than copied
     if isinstance(payload, pd.DataFrame):
-        df = payload.copy()
+        df = payload
     elif payload is None:
         return pd.DataFrame()
     else:
@@ -191,69 +409,113 @@ def _to_dataframe(payload) -> pd.DataFrame:
                 f"Unexpected response type from OpenAlgo history: {type(payload)}"
             ) from exc
 
+    if _is_canonical_frame(df):
+        # Already flat OHLCV with canonical names: the normalization passes would be no-ops
+        return df
+
     df = _denormalize_frame(df)
     df = _lowercase_columns(df)
     df = _apply_aliases(df)
     return df
 
 
+_CANONICAL_COLUMNS = frozenset({"open", "high", "low", "close", "volume"})
+
+
+def _is_canonical_frame(df: pd.DataFrame) -> bool:
+    if df.empty or not _CANONICAL_COLUMNS.issubset(df.columns):
+        return False
+    if not all(isinstance(col, str) and col == col.lower() and "." not in col for col in df.columns):
+        return False
+    # Nested payloads show up as dicts from the first row on
+    return not any(isinstance(value, dict) for value in df.iloc[0].tolist())
+
+
 def _lowercase_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = [str(col).split(".")[-1].lower() for col in df.columns]
-    return df
+    # rename() builds a new column Index only; the data blocks are shared, not copied
+    return df.rename(columns=lambda col: str(col).rsplit(".", 1)[-1].lower())
+
+
+def _records_frame(records: list) -> pd.DataFrame:
+    """
+    Frame from a list of dicts. Flat dicts (the usual OpenAlgo shape) go
+    straight to the DataFrame constructor; json_normalize's recursive
+    flattening is only used when an object column turns out to hold dicts.
+    """
+    import pandas as pd
+
+    try:
+        frame = pd.DataFrame(records)
+    except (TypeError, ValueError):
+        return pd.json_normalize(records)
+    nested = any(
+        frame[col].dtype == object and any(isinstance(value, dict) for value in frame[col].to_numpy())
+        for col in frame.columns
+    )
+    return pd.json_normalize(records) if nested else frame
 
 
 def _denormalize_frame(df: pd.DataFrame, max_depth: int = 3) -> pd.DataFrame:
-    current = df.copy()
+    current = df
     depth = 0
     while depth < max_depth:
         if current.empty:
             return current
         first_value = current.iloc[0, 0]
         if len(current.columns) == 1 and isinstance(first_value, dict):
-            current = pd.json_normalize(current.iloc[:, 0])
+            current = _records_frame(current.iloc[:, 0].tolist())
             depth += 1
             continue
         break
-    # Flatten columns with dict entries
-    for col in list(current.columns):
-        if current[col].apply(lambda v: isinstance(v, dict)).any():
-            expanded = pd.json_normalize(current[col].apply(lambda v: v or {}))
-            expanded.columns = [f"{col}.{c}" for c in expanded.columns]
-            current = current.drop(columns=[col]).join(expanded)
+    # Flatten columns with dict entries. Only object columns can hold dicts, so
+    # numeric/string columns are skipped without touching their values, and the
+    # scan stops at the first dict instead of building a boolean Series
+    dict_cols = [
+        col for col in current.columns
+        if current[col].dtype == object and any(isinstance(v, dict) for v in current[col].to_numpy())
+    ]
+    for col in dict_cols:
+        records = [v if isinstance(v, dict) else {} for v in current[col].to_numpy()]
+        expanded = _records_frame(records).add_prefix(f"{col}.")
+        current = current.drop(columns=[col]).join(expanded)
     return current
 
 
+# OpenAlgo payload column spellings -> canonical OHLCV names
+_COLUMN_ALIASES = {
+    "o": "open",
+    "openprice": "open",
+    "open_price": "open",
+    "openvalue": "open",
+    "open_val": "open",
+    "op": "open",
+    "h": "high",
+    "highprice": "high",
+    "high_price": "high",
+    "highvalue": "high",
+    "l": "low",
+    "lowprice": "low",
+    "low_price": "low",
+    "lowvalue": "low",
+    "c": "close",
+    "closeprice": "close",
+    "close_price": "close",
+    "closevalue": "close",
+    "cp": "close",
+    "v": "volume",
+    "vol": "volume",
+    "volume_value": "volume",
+    "volume_traded": "volume",
+}
+
+
 def _apply_aliases(df: pd.DataFrame) -> pd.DataFrame:
-    aliases = {
-        "o": "open",
-        "openprice": "open",
-        "open_price": "open",
-        "openvalue": "open",
-        "open_val": "open",
-        "op": "open",
-        "h": "high",
-        "highprice": "high",
-        "high_price": "high",
-        "highvalue": "high",
-        "l": "low",
-        "lowprice": "low",
-        "low_price": "low",
-        "lowvalue": "low",
-        "c": "close",
-        "closeprice": "close",
-        "close_price": "close",
-        "closevalue": "close",
-        "cp": "close",
-        "v": "volume",
-        "vol": "volume",
-        "volume_value": "volume",
-        "volume_traded": "volume",
+    present = set(df.columns)
+    rename_map = {
+        col: _COLUMN_ALIASES[col]
+        for col in present.intersection(_COLUMN_ALIASES)
+        if _COLUMN_ALIASES[col] not in present
     }
-    rename_map = {}
-    for col in df.columns:
-        if col in aliases and aliases[col] not in df.columns:
-            rename_map[col] = aliases[col]
     if rename_map:
         df = df.rename(columns=rename_map)
     return df
@@ -272,7 +534,7 @@ def list_available_series(target_tz: Optional[str] = "Asia/Kolkata", sort_order:
     """
     order = "ASC" if sort_order.lower() == "asc" else "DESC"
 
-    with get_conn() as conn:
+    with pooled_conn() as conn, conn.cursor() as cur:
         sql = f"""
             SELECT
                 symbol,
@@ -285,28 +547,22 @@ def list_available_series(target_tz: Optional[str] = "Asia/Kolkata", sort_order:
             GROUP BY symbol, exchange, interval
             ORDER BY symbol {order}, exchange {order}, interval {order};
         """
-        df = pd.read_sql(sql, conn, parse_dates=["first_ts", "last_ts"])
-
-    if df.empty:
-        return []
-
-    if target_tz:
-        df["first_ts"] = pd.to_datetime(df["first_ts"], utc=True).dt.tz_convert(target_tz)
-        df["last_ts"] = pd.to_datetime(df["last_ts"], utc=True).dt.tz_convert(target_tz)
-    else:
-        df["first_ts"] = pd.to_datetime(df["first_ts"], utc=True)
-        df["last_ts"] = pd.to_datetime(df["last_ts"], utc=True)
+        cur.execute(sql)
+        rows = cur.fetchall()
 
+    # One row per series: psycopg2's tz-aware datetimes are used directly,
+    # with no DataFrame round trip
+    tz = ZoneInfo(target_tz) if target_tz else timezone.utc
     return [
         {
-            "symbol": row["symbol"],
-            "exchange": row["exchange"],
-            "interval": row["interval"],
-            "start_ts": row["first_ts"].isoformat() if pd.notna(row["first_ts"]) else None,
-            "end_ts": row["last_ts"].isoformat() if pd.notna(row["last_ts"]) else None,
-            "rows_count": int(row["rows_count"]),
+            "symbol": symbol,
+            "exchange": exchange,
+            "interval": interval,
+            "start_ts": first_ts.astimezone(tz).isoformat() if first_ts is not None else None,
+            "end_ts": last_ts.astimezone(tz).isoformat() if last_ts is not None else None,
+            "rows_count": int(rows_count),
         }
-        for _, row in df.iterrows()
+        for symbol, exchange, interval, first_ts, last_ts, rows_count in rows
     ]
 
 
@@ -322,7 +578,7 @@ def delete_series(symbol: str, exchange: str, interval: str) -> int:
     Returns:
         Number of rows deleted
     """
-    with get_conn() as conn, conn.cursor() as cur:
+    with pooled_conn() as conn, conn.cursor() as cur:
         cur.execute(
             """
             DELETE FROM ohlcv
@@ -348,6 +604,7 @@ def _fetch_single_symbol(
     also_save_csv: Optional[str] = None,
 ) -> int:
     """Internal function to fetch a single symbol"""
+    import pandas as pd
 
     def _coerce_ist(value: str, field_name: str) -> pd.Timestamp:
         if not value:
@@ -371,28 +628,34 @@ def _fetch_single_symbol(
     requested_start_date = start_ist.date()
     requested_end_date = end_ist.date()
 
+    if _range_covered(symbol, exchange, interval, start_ist, end_ist):
+        print(
+            f"ℹ️ Requested {symbol} {exchange} {interval} window "
+            f"{requested_start_date} → {requested_end_date} already present in TimescaleDB."
+        )
+        return 0
+
     fetch_windows: list[tuple[pd.Timestamp, pd.Timestamp]] = []
 
+    # Only partially covered (or new) series pay for the full coverage aggregate,
+    # which is needed to work out the missing windows
     coverage = get_series_coverage(symbol, exchange, interval)
     if coverage and coverage["first_ts"] is not None and coverage["last_ts"] is not None:
-        coverage_start_date = coverage["first_ts"].tz_convert(IST_TZ).date()
-        coverage_end_date = coverage["last_ts"].tz_convert(IST_TZ).date()
-
-        if (
-            requested_start_date >= coverage_start_date
-            and requested_end_date <= coverage_end_date
-        ):
-            print(
-                f"ℹ️ Requested {symbol} {exchange} {interval} window "
-                f"{requested_start_date} → {requested_end_date} already present in TimescaleDB."
-            )
-            return 0
+        ist = ZoneInfo(IST_TZ)
+        coverage_start_date = coverage["first_ts"].astimezone(ist).date()
+        coverage_end_date = coverage["last_ts"].astimezone(ist).date()
 
         if requested_start_date < coverage_start_date:
             fetch_start = requested_start_date
             fetch_end = min(requested_end_date, coverage_start_date - timedelta(days=1))
             if fetch_start <= fetch_end:
                 fetch_windows.append((fetch_start, fetch_end))
+                if coverage_end_date - fetch_start > OHLCV_CHUNK_INTERVAL:
+                    logger.info(
+                        "Backfilling %s %s %s from %s into chunks before the latest bar (%s); "
+                        "older chunks insert more slowly.",
+                        symbol, exchange, interval, fetch_start, coverage["last_ts"],
+                    )
 
         if requested_end_date > coverage_end_date:
             fetch_start = max(requested_start_date, coverage_end_date + timedelta(days=1))
@@ -416,69 +679,107 @@ def _fetch_single_symbol(
             "Missing dependency `openalgo`. Install within the container image or virtualenv."
         ) from exc
 
-    client = openalgo_api(api_key=API_KEY, host=API_HOST)
-
     total_rows = 0
     csv_frames: list[pd.DataFrame] = []
 
+    # Split each window into FETCH_CHUNK_DAYS requests when configured. Later
+    # chunks download on a small thread pool while earlier ones are being
+    # upserted; results are consumed in date order so logs and the combined CSV
+    # stay ordered.
+    chunks: list[tuple] = []
     for window_start, window_end in fetch_windows:
-        fetch_start_str = window_start.isoformat()
-        fetch_end_str = window_end.isoformat()
-        print(
-            f"⬇️ Fetching {symbol} {exchange} {interval} | {fetch_start_str} → {fetch_end_str} (IST)"
-        )
-
-        raw = client.history(
+        if FETCH_CHUNK_DAYS == 0:
+            chunks.append((window_start, window_end))
+            continue
+        chunk_start = window_start
+        while chunk_start <= window_end:
+            chunk_end = min(chunk_start + timedelta(days=FETCH_CHUNK_DAYS - 1), window_end)
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end + timedelta(days=1)
+
+    # The OpenAlgo client isn't documented as thread-safe; give each download thread its own
+    clients = threading.local()
+
+    def _history(chunk_start, chunk_end):
+        client = getattr(clients, "client", None)
+        if client is None:
+            client = clients.client = openalgo_api(api_key=API_KEY, host=API_HOST)
+        return client.history(
             symbol=symbol,
             exchange=exchange,
             interval=interval,
-            start_date=fetch_start_str,
-            end_date=fetch_end_str,
+            start_date=chunk_start.isoformat(),
+            end_date=chunk_end.isoformat(),
         )
-        df = _to_dataframe(raw)
-        if {"error", "message"}.issubset(df.columns):
-            raise RuntimeError(f"OpenAlgo error: {df.iloc[0]['message']}")
-        if "error" in df.columns and "message" not in df.columns:
-            raise RuntimeError(f"OpenAlgo error response: {df.iloc[0]['error']}")
-        if "status" in df.columns and df["status"].iloc[0] not in ("ok", "success"):
-            detail = df["status"].iloc[0]
-            if "message" in df.columns:
-                detail = f"{detail}: {df['message'].iloc[0]}"
-            raise RuntimeError(f"OpenAlgo status {detail}")
-
-        if df.empty:
+
+    executor = ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(chunks)))
+    try:
+        futures = [executor.submit(_history, chunk_start, chunk_end) for chunk_start, chunk_end in chunks]
+        for (chunk_start, chunk_end), future in zip(chunks, futures):
+            fetch_start_str = chunk_start.isoformat()
+            fetch_end_str = chunk_end.isoformat()
             print(
-                f"⚠️ OpenAlgo returned no rows for {symbol} {exchange} {interval} in "
-                f"{fetch_start_str} → {fetch_end_str}. Skipping."
+                f"⬇️ Fetching {symbol} {exchange} {interval} | {fetch_start_str} → {fetch_end_str} (IST)"
             )
-            continue
 
-        if "timestamp" in df.columns:
-            df = df.set_index(pd.to_datetime(df["timestamp"], utc=False))
-            df = df.drop(columns=["timestamp"])
-
-        expected = {"open", "high", "low", "close", "volume"}
-        if not expected.issubset(set(df.columns)):
-            col_map = {}
-            for c in ["open", "high", "low", "close", "volume", "oi"]:
-                if c in df.columns:
-                    col_map[c] = c
-            missing = expected - set(col_map.keys())
-            if missing:
-                raise ValueError(f"Missing columns in history DataFrame: {missing}")
-            df = df.rename(columns=col_map)
-
-        idx = pd.to_datetime(df.index)
-        if idx.tz is None:
-            idx = idx.tz_localize("Asia/Kolkata")
-        df.index = idx.tz_convert("UTC")
-
-        rows = upsert_ohlcv(df, symbol, exchange, interval)
-        total_rows += rows
-        print(f"✅ Upserted {rows} rows for {symbol} {exchange} {interval} ({fetch_start_str} → {fetch_end_str})")
-
-        if also_save_csv:
-            csv_frames.append(df)
+            raw = future.result()
+            df = _to_dataframe(raw)
+            if {"error", "message"}.issubset(df.columns):
+                raise RuntimeError(f"OpenAlgo error: {df.iloc[0]['message']}")
+            if "error" in df.columns and "message" not in df.columns:
+                raise RuntimeError(f"OpenAlgo error response: {df.iloc[0]['error']}")
+            if "status" in df.columns and df["status"].iloc[0] not in ("ok", "success"):
+                detail = df["status"].iloc[0]
+                if "message" in df.columns:
+                    detail = f"{detail}: {df['message'].iloc[0]}"
+                raise RuntimeError(f"OpenAlgo status {detail}")
+
+            if df.empty:
+                print(
+                    f"⚠️ OpenAlgo returned no rows for {symbol} {exchange} {interval} in "
+                    f"{fetch_start_str} → {fetch_end_str}. Skipping."
+                )
+                continue
+
+            # Parse the timestamps once, straight into a DatetimeIndex
+            if "timestamp" in df.columns:
+                idx = pd.DatetimeIndex(pd.to_datetime(df["timestamp"], utc=False))
+                df = df.drop(columns=["timestamp"])
+            else:
+                idx = pd.DatetimeIndex(pd.to_datetime(df.index))
+
+            expected = {"open", "high", "low", "close", "volume"}
+            if not expected.issubset(set(df.columns)):
+                col_map = {}
+                for c in ["open", "high", "low", "close", "volume", "oi"]:
+                    if c in df.columns:
+                        col_map[c] = c
+                missing = expected - set(col_map.keys())
+                if missing:
+                    raise ValueError(f"Missing columns in history DataFrame: {missing}")
+                df = df.rename(columns=col_map)
+
+            # Cast the bar columns once in compiled code (OpenAlgo may send numbers as
+            # strings); blank or junk oi values become NaN, which is stored as NULL
+            df = df.astype({column: "float64" for column in expected})
+            if "oi" in df.columns:
+                df["oi"] = pd.to_numeric(df["oi"], errors="coerce")
+
+            # Localize/convert the whole index in one vectorized step; the COPY
+            # encoder then reads it as int64 microseconds
+            if idx.tz is None:
+                idx = idx.tz_localize(IST_TZ)
+            df = df.set_axis(idx.tz_convert("UTC"), axis=0)
+
+            rows = upsert_ohlcv(df, symbol, exchange, interval)
+            total_rows += rows
+            print(f"✅ Upserted {rows} rows for {symbol} {exchange} {interval} ({fetch_start_str} → {fetch_end_str})")
+
+            if also_save_csv:
+                csv_frames.append(df)
+    finally:
+        # On error, drop fetches that haven't started yet
+        executor.shutdown(wait=True, cancel_futures=True)
 
     if also_save_csv and csv_frames:
         combined = pd.concat(csv_frames).sort_index()
@@ -504,19 +805,20 @@ def fetch_history_to_tsdb(
     start_date: str,
     end_date: str,
     also_save_csv: Optional[str] = None,
+    expand_option_pair: bool = True,
 ) -> int:
     """
     Pull from OpenAlgo → upsert into TimescaleDB.
 
     If the symbol is an option (ends with PE or CE), automatically fetches
-    both PE and CE variants.
+    both PE and CE variants unless `expand_option_pair` is False.
 
     Returns: total rows upserted across all symbols
     """
-    ensure_schema()
+    _ensure_schema_once()
 
     # Check if this is an option symbol
-    if is_option_symbol(symbol):
+    if expand_option_pair and is_option_symbol(symbol):
         pe_symbol, ce_symbol = get_option_pair(symbol)
         print(f"📊 Detected option symbol. Will fetch both {pe_symbol} and {ce_symbol}")
 
@@ -547,6 +849,9 @@ def fetch_history_to_tsdb(
         return _fetch_single_symbol(symbol, exchange, interval, start_date, end_date, also_save_csv)
 
 
+OHLCV_READ_DTYPES = {column: "float64" for column in ("open", "high", "low", "close", "volume", "oi")}
+
+
 def read_ohlcv_from_tsdb(
     symbol: str,
     exchange: str,
@@ -556,10 +861,13 @@ def read_ohlcv_from_tsdb(
     target_tz: Optional[str] = "Asia/Kolkata",
 ) -> pd.DataFrame:
     """Read a sliced window into a pandas DataFrame (sorted ascending)"""
-    with get_conn() as conn:
+    import pandas as pd
+
+    buffer = io.BytesIO()
+    with pooled_conn() as conn:
         if target_tz:
             with conn.cursor() as cur:
-                cur.execute("SET TIME ZONE %s", (target_tz,))
+                cur.execute("SET LOCAL TIME ZONE %s", (target_tz,))
 
         where = ["symbol = %(symbol)s", "exchange = %(exchange)s", "interval = %(interval)s"]
         params = {"symbol": symbol, "exchange": exchange, "interval": interval}
@@ -576,15 +884,20 @@ def read_ohlcv_from_tsdb(
             WHERE {' AND '.join(where)}
             ORDER BY ts ASC
         """
-        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            cur.execute(sql, params)
-            rows = cur.fetchall()
-
-    if not rows:
+        # COPY streams the window as one CSV payload instead of a Python row object per bar;
+        # COPY takes no bind parameters, so they are inlined with mogrify
+        with conn.cursor() as cur:
+            query = cur.mogrify(sql, params)
+            cur.copy_expert(b"COPY (" + query + b") TO STDOUT WITH (FORMAT csv, HEADER)", buffer)
+
+    buffer.seek(0)
+    # round_trip keeps the float8 text exact (the default parser can be off by an ulp);
+    # explicit dtypes keep whole-number columns (e.g. volume) float64 as before
+    df = pd.read_csv(buffer, dtype=OHLCV_READ_DTYPES, float_precision="round_trip")
+    if df.empty:
         return pd.DataFrame()
 
-    df = pd.DataFrame.from_records(rows)
-    df["ts"] = pd.to_datetime(df["ts"], utc=True)
+    df["ts"] = pd.to_datetime(df["ts"], utc=True, format="ISO8601")
 
     df = df.set_index("ts")
     idx = pd.to_datetime(df.index)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Response helpers shared by the single-run API (main.py) and the master app
+(master/main.py): orjson responses, DataFrame-to-JSON conversion, cached
+template pages and the series coverage cache.
+"""
+
+from __future__ import annotations
+
+import numbers
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.templating import Jinja2Templates
+
+from symbol_utils import get_option_pair, is_option_symbol
+from tsdb_pipeline import get_series_coverage
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (numpy scalars/arrays and naive datetimes as UTC)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS,
+        )
+
+
+# ---------- DataFrame -> JSON records ----------
+
+TRADE_COLUMNS = [
+    "entry_time",
+    "exit_time",
+    "symbol",
+    "side",
+    "entry",
+    "exit",
+    "gross_rupees",
+    "costs_rupees",
+    "pnl_rupees",
+    "exit_reason",
+]
+
+
+@lru_cache(maxsize=64)
+def _available_trade_columns(columns: Tuple[str, ...]) -> Tuple[str, ...]:
+    """TRADE_COLUMNS present in a trades frame; strategies return the same columns every run."""
+    present = set(columns)
+    return tuple(c for c in TRADE_COLUMNS if c in present)
+
+
+# Built once so tz_localize/tz_convert don't resolve the zone name on every call
+IST_TZ = ZoneInfo("Asia/Kolkata")
+
+# Asia/Kolkata has a fixed +05:30 offset: shift the UTC values by it and let numpy
+# format the wall-clock time in C, then bake in the isoformat() suffix.
+IST_UTC_OFFSET = np.timedelta64(5 * 3600 + 30 * 60, "s")
+IST_ISO_SUFFIX = "+05:30"
+
+
+def ist_iso_column(column: pd.Series) -> List[Optional[str]]:
+    """
+    Format a column as IST ISO-8601 strings (naive values are treated as UTC),
+    matching Timestamp.isoformat(): microseconds appear only when non-zero.
+    """
+    ts = pd.to_datetime(column, errors="coerce", utc=True)
+    wall = ts.dt.tz_localize(None).to_numpy(dtype="datetime64[us]") + IST_UTC_OFFSET
+    fractional = wall.astype(np.int64) % 1_000_000 != 0
+    if fractional.any():
+        text = np.datetime_as_string(wall, unit="us").tolist()
+        # Whole seconds keep the short form, as isoformat() writes them
+        for idx in np.flatnonzero(~fractional):
+            text[idx] = text[idx][:-7]
+    else:
+        text = np.datetime_as_string(wall, unit="s").tolist()
+    if not ts.hasnans:
+        return [value + IST_ISO_SUFFIX for value in text]
+    missing = ts.isna().to_numpy().tolist()
+    return [None if null else value + IST_ISO_SUFFIX for value, null in zip(text, missing)]
+
+
+def _normalize_scalar(value: Any) -> Any:
+    """Normalize a non-null cell; nulls are masked per column by the caller."""
+    if isinstance(value, str):
+        return value or None
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Number):
+        return float(value)
+    return value
+
+
+def column_values(column: pd.Series) -> List[Any]:
+    """Convert a column to native Python values with one dtype dispatch per column."""
+    # Extension dtypes (Int64, string, ...) carry their own NA and take the masked path
+    kind = column.dtype.kind if isinstance(column.dtype, np.dtype) else "O"
+    if kind in "iu":
+        return column.to_numpy().tolist()
+    if kind == "b":
+        return column.to_numpy().astype(np.int64).tolist()
+    if kind == "f":
+        values = column.to_numpy(dtype=np.float64)
+        out = values.tolist()
+        for idx in np.flatnonzero(np.isnan(values)):
+            out[idx] = None
+        return out
+    null_mask = column.isna().to_numpy()
+    return [
+        None if is_null else _normalize_scalar(value)
+        for value, is_null in zip(column.tolist(), null_mask)
+    ]
+
+
+def frame_to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Records with native Python values, converted one column at a time."""
+    names = list(frame.columns)
+    columns = [column_values(frame[name]) for name in names]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def serialize_trades(trades: pd.DataFrame, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    if trades.empty:
+        return []
+
+    available_cols = _available_trade_columns(tuple(trades.columns))
+    frame = trades[list(available_cols)]
+    if limit:
+        frame = frame.tail(limit)
+
+    # Convert column-at-a-time so the per-cell work stays inside pandas/numpy
+    columns: Dict[str, List[Any]] = {}
+    for col in available_cols:
+        if col in ("entry_time", "exit_time"):
+            columns[col] = ist_iso_column(frame[col])
+        else:
+            columns[col] = column_values(frame[col])
+    for time_field in ("entry_time", "exit_time"):
+        columns.setdefault(time_field, [None] * len(frame))
+
+    names = list(columns.keys())
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+@lru_cache(maxsize=1024)
+def to_ist_timestamp(value: str) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(IST_TZ)
+    else:
+        ts = ts.tz_convert(IST_TZ)
+    return ts
+
+
+# ---------- Pages ----------
+
+@lru_cache(maxsize=8)
+def _render_template(templates: Jinja2Templates, name: str, mtime_ns: int) -> str:
+    """The UI templates take no per-request context, so each file version renders once."""
+    return templates.get_template(name).render()
+
+
+def render_page(templates: Jinja2Templates, templates_dir: Path, name: str) -> HTMLResponse:
+    # Keyed on mtime so template edits still show up without a restart
+    return HTMLResponse(_render_template(templates, name, (templates_dir / name).stat().st_mtime_ns))
+
+
+# ---------- Series coverage cache ----------
+
+COVERAGE_CACHE_TTL_SECONDS = 30.0
+COVERAGE_CACHE_MAXSIZE = 1024
+_COVERAGE_CACHE: Dict[Tuple[str, str, str], Tuple[float, Optional[dict]]] = {}
+_COVERAGE_CACHE_LOCK = threading.Lock()
+
+
+def cached_coverage(symbol: str, exchange: str, interval: str) -> Optional[dict]:
+    """`get_series_coverage` with a short TTL; entries are dropped when we ingest rows."""
+    key = (symbol, exchange, interval)
+    now = time.monotonic()
+    with _COVERAGE_CACHE_LOCK:
+        cached = _COVERAGE_CACHE.get(key)
+    if cached is not None and now - cached[0] < COVERAGE_CACHE_TTL_SECONDS:
+        return cached[1]
+
+    coverage = get_series_coverage(symbol, exchange, interval)
+    with _COVERAGE_CACHE_LOCK:
+        if len(_COVERAGE_CACHE) >= COVERAGE_CACHE_MAXSIZE:
+            _COVERAGE_CACHE.clear()
+        _COVERAGE_CACHE[key] = (now, coverage)
+    return coverage
+
+
+def invalidate_coverage(symbol: str, exchange: str, interval: str) -> None:
+    symbols = {symbol}
+    if is_option_symbol(symbol):
+        symbols.update(sym for sym in get_option_pair(symbol) if sym)
+    with _COVERAGE_CACHE_LOCK:
+        for sym in symbols:
+            _COVERAGE_CACHE.pop((sym, exchange, interval), None)